@@ -1,8 +1,88 @@
+import argparse
 import asyncio
+import sys
+
+# Only the modules of the chosen command are imported (torch, matplotlib and the GA only when training),
+# so `play` starts quickly and the processes spawned by the trainer, which re-import this file, stay light
+
+
+def play(args) -> None:
+    from src.game import Game
+    from src.utils import Profiler
+
+    profiler = Profiler(args.trace) if args.profile or args.trace else None
+    asyncio.run(Game(Game.GameMode.PLAY, profiler=profiler).start())
+
+
+def train(args) -> None:
+    from src.train import TrainGA
+
+    # Command line options replace the values of src/ai/config.yaml
+    overrides = {}
+    if args.headless:
+        overrides['headless'] = True
+    if args.no_plotter:
+        overrides['plotter'] = {'enabled': False}
+    if args.seed is not None:
+        overrides['seed'] = args.seed
+    if args.workers is not None:
+        overrides['workers'] = args.workers
+    if args.generations is not None:
+        overrides['stop_condition'] = {'generations': args.generations}
+    if args.resume:
+        overrides['checkpoint'] = {'resume': True}
+    if args.profile:
+        overrides['profiling'] = {'enabled': True}
+    asyncio.run(TrainGA(overrides).start())
+
+
+def evaluate(args) -> None:
+    from src.evaluate import main
+
+    main(args.args)
+
+
+def benchmark(args) -> None:
+    from src.benchmark import main
+
+    main(args.args)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Flappy Bird and its genetic algorithm trained AI')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+
+    parser_play = commands.add_parser('play', help='play the game yourself')
+    parser_play.add_argument('--profile', action='store_true', help='print the time spent in each phase after every round')
+    parser_play.add_argument('--trace', metavar='FILE', help='also write a Chrome trace of the phases when quitting')
+    parser_play.set_defaults(handler=play)
+
+    parser_train = commands.add_parser('train', help='train the AI (the default command), configured by src/ai/config.yaml')
+    parser_train.add_argument('--headless', action='store_true', help='train without window')
+    parser_train.add_argument('--no-plotter', action='store_true', help='do not show the network visualizer')
+    parser_train.add_argument('--generations', type=int, help='stop after this many generations')
+    parser_train.add_argument('--seed', type=int)
+    parser_train.add_argument('--workers', type=int, help='processes playing each generation (headless only)')
+    parser_train.add_argument('--resume', action='store_true', help='resume from the latest checkpoint')
+    parser_train.add_argument('--profile', action='store_true', help='print the time spent in each phase after every generation')
+    parser_train.set_defaults(handler=train)
+
+    # The options of these two are parsed by their own modules
+    parser_evaluate = commands.add_parser('evaluate', help='play the best saved model on seeded levels (see --help)', add_help=False)
+    parser_evaluate.set_defaults(handler=evaluate)
+    parser_benchmark = commands.add_parser('benchmark', help='measure the training throughput (see --help)', add_help=False)
+    parser_benchmark.set_defaults(handler=benchmark)
+
+    argv = sys.argv[1:] if argv is None else argv
+    # Training is the default, as it was before the subcommands existed
+    if not argv or argv[0].startswith('-') and argv[0] not in ('-h', '--help'):
+        argv = ['train', *argv]
+    args, args.args = parser.parse_known_args(argv)
+    if args.args and args.handler not in (evaluate, benchmark):
+        parser.error(f'unrecognized arguments: {" ".join(args.args)}')
+    return args
 
-from src.game import Game
-from src.train import TrainGA
 
 if __name__ == "__main__":
-    #asyncio.run(Game(Game.GameMode.PLAY).start())
-    asyncio.run(TrainGA().start())
+    args = parse_args()
+    args.handler(args)
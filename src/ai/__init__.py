@@ -1,4 +1,5 @@
 from pathlib import Path
 
 AI_CONFIG_PATH = Path(__file__).parent.absolute() / 'config.yaml'
-BEST_MODEL_PATH = AI_CONFIG_PATH.parent / 'best.pth'
\ No newline at end of file
+BEST_MODEL_PATH = AI_CONFIG_PATH.parent / 'best.pth'
+CHECKPOINT_DIR = AI_CONFIG_PATH.parent / 'checkpoints'
\ No newline at end of file
@@ -0,0 +1,141 @@
+import importlib.util
+import io
+import pickle
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .numpy_model import NumpyFF, NumpyPopulation
+
+# Inference backends (config.yaml: network.backend), both use the same chromosomes and best.pth files:
+#   - numpy: NumpyFF / NumpyPopulation, the default, torch isn't imported at all
+#   - torch: FF / FFPopulation of model.py, needs torch installed
+# torch is optional: it is only imported here when the torch backend is used
+
+BACKENDS = ('numpy', 'torch')
+
+
+def torch_available() -> bool:
+    return importlib.util.find_spec('torch') is not None
+
+
+def _check(backend:str) -> None:
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown network backend {backend!r}, expected one of {", ".join(BACKENDS)}')
+    if backend == 'torch' and not torch_available():
+        raise ImportError('The torch network backend needs torch installed (pip install torch), or use network.backend: numpy')
+
+
+def create_network(chromosome:Optional[np.ndarray]=None, backend:str='numpy', **network):
+    ### Single network (FF or NumpyFF) of the backend
+    _check(backend)
+    if backend == 'torch':
+        from .model import FF
+        return FF(chromosome, **network)
+    return NumpyFF(chromosome, **network)
+
+
+def create_population(chromosomes:np.ndarray, backend:str='numpy', **network):
+    ### Batched networks (FFPopulation or NumpyPopulation) of the backend, the networks are views into the chromosomes matrix
+    _check(backend)
+    if backend == 'torch':
+        import torch
+        from .model import FFPopulation
+        return FFPopulation(torch.from_numpy(chromosomes), **network)
+    return NumpyPopulation(chromosomes, **network)
+
+
+def random_chromosomes(size:int, hidden_layers:Sequence[int]=(6, 3), activations:Optional[Sequence[str]]=None) -> np.ndarray:
+    ### Same chromosomes (numpy RNG) whatever the backend
+    return NumpyFF.random_chromosomes(size, hidden_layers, activations)
+
+
+def manual_seed(seed:int, backend:str='numpy') -> None:
+    ### Seeds the RNG of the backend, besides numpy's global one
+    np.random.seed(seed)
+    if backend == 'torch':
+        import torch
+        torch.manual_seed(seed)
+
+
+def set_num_threads(threads:int, backend:str='numpy') -> None:
+    if backend == 'torch':
+        import torch
+        torch.set_num_threads(threads)
+
+
+### Saved models: the state dict of FF ('fc1.weight', 'fc1.bias', ...), written by torch.save as best.pth with the torch backend.
+### The numpy backend writes the same keys to a .npz file next to it, and reads best.pth without torch (see _read_pth)
+
+def _state_key(key:str) -> str:
+    # chromosome layout key (w1, b1, ...) to state dict key (fc1.weight, fc1.bias, ...)
+    return f'fc{key[1:]}.{"weight" if key[0] == "w" else "bias"}'
+
+
+def save_chromosome(chromosome:np.ndarray, layout:list, path:Path, backend:str='numpy') -> Path:
+    ### Saves the chromosome as a state dict, returns the file written
+    path = Path(path)
+    state = OrderedDict((_state_key(key), np.array(chromosome[start:end]).reshape(shape)) for key, shape, start, end in layout)
+    if backend == 'torch':
+        import torch
+        torch.save(OrderedDict((key, torch.from_numpy(value)) for key, value in state.items()), path)
+    else:
+        path = path.with_suffix('.npz')
+        np.savez(path, **state)
+    return path
+
+
+def load_chromosome(layout:list, path:Path) -> Optional[np.ndarray]:
+    ### Chromosome of the most recent of path (.pth) and its .npz version, None if neither exists
+    path = Path(path)
+    candidates = [candidate for candidate in (path, path.with_suffix('.npz')) if candidate.exists()]
+    if not candidates:
+        return None
+    latest = max(candidates, key=lambda candidate: candidate.stat().st_mtime)
+    if latest.suffix == '.npz':
+        with np.load(latest) as data:
+            state = dict(data)
+    else:
+        state = _read_pth(latest)
+    return np.concatenate([np.asarray(state[_state_key(key)], dtype=np.float32).reshape(-1) for key, _, _, _ in layout])
+
+
+class _PthUnpickler(pickle.Unpickler):
+    # Rebuilds the tensors of a torch.save zip file as numpy arrays, only what a state dict of float tensors uses
+    DTYPES = {'FloatStorage': np.float32, 'DoubleStorage': np.float64, 'HalfStorage': np.float16}
+
+    def __init__(self, file, archive:zipfile.ZipFile, prefix:str):
+        super().__init__(file)
+        self.archive = archive
+        self.prefix = prefix
+
+    def find_class(self, module, name):
+        if module == 'collections' and name == 'OrderedDict':
+            return OrderedDict
+        if module == 'torch' and name in self.DTYPES:
+            return self.DTYPES[name]
+        if module == 'torch._utils' and name == '_rebuild_tensor_v2':
+            return self._rebuild_tensor
+        raise pickle.UnpicklingError(f'Unsupported object in the model file: {module}.{name}')
+
+    def persistent_load(self, pid):
+        # ('storage', storage type, key, location, number of elements)
+        _, dtype, key, _, numel = pid
+        data = self.archive.read(f'{self.prefix}data/{key}')
+        return np.frombuffer(data, dtype=np.dtype(dtype).newbyteorder('<'), count=numel)
+
+    @staticmethod
+    def _rebuild_tensor(storage, offset, size, stride, *_):
+        itemsize = storage.itemsize
+        return np.lib.stride_tricks.as_strided(storage[offset:], shape=size, strides=[s * itemsize for s in stride]).copy()
+
+
+def _read_pth(path:Path) -> dict:
+    ### Reads a state dict saved by torch.save without torch, whatever the backend
+    with zipfile.ZipFile(path) as archive:
+        pickle_name = next(name for name in archive.namelist() if name.endswith('data.pkl'))
+        prefix = pickle_name[:-len('data.pkl')]
+        return _PthUnpickler(io.BytesIO(archive.read(pickle_name)), archive, prefix).load()
@@ -0,0 +1,104 @@
+import os
+import random
+import sys
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# Training checkpoints: everything needed to resume a run exactly where it stopped, in a single .npz file
+# (population matrix, best individual, fitness history, generation counter and the state of every RNG).
+# Only numeric arrays are stored, so the files can be loaded without pickle.
+
+PREFIX = 'checkpoint_'
+
+
+def checkpoint_path(directory:Path, generation:int) -> Path:
+    return Path(directory) / f'{PREFIX}{generation:06d}.npz'
+
+
+def list_checkpoints(directory:Path) -> list:
+    ### Checkpoints of the directory, oldest first (the generation is zero padded in the name)
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob(f'{PREFIX}*.npz'))
+
+
+def latest_checkpoint(directory:Path) -> Optional[Path]:
+    checkpoints = list_checkpoints(directory)
+    return checkpoints[-1] if checkpoints else None
+
+
+def rng_state(rng:random.Random) -> dict:
+    ### State of the python, numpy (global) and torch RNGs as arrays, torch's only when it is in use (torch network backend)
+    version, internal, gauss_next = rng.getstate()
+    _, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    state = {
+        'rng_python': np.array(internal, dtype=np.uint64),
+        'rng_python_version': np.array(version),
+        'rng_python_gauss': np.array(np.nan if gauss_next is None else gauss_next),
+        'rng_numpy_keys': keys,
+        'rng_numpy': np.array([pos, has_gauss, cached_gaussian], dtype=np.float64),
+    }
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        state['rng_torch'] = torch.get_rng_state().numpy()
+    return state
+
+
+def restore_rng_state(rng:random.Random, data) -> None:
+    gauss_next = float(data['rng_python_gauss'])
+    rng.setstate((
+        int(data['rng_python_version']),
+        tuple(int(value) for value in data['rng_python']),
+        None if np.isnan(gauss_next) else gauss_next))
+    pos, has_gauss, cached_gaussian = data['rng_numpy']
+    np.random.set_state(('MT19937', data['rng_numpy_keys'], int(pos), int(has_gauss), float(cached_gaussian)))
+    torch = sys.modules.get('torch')
+    if torch is not None and 'rng_torch' in data:
+        torch.set_rng_state(torch.from_numpy(data['rng_torch'].copy()))
+
+
+def save_checkpoint(directory:Path, generation:int, population:np.ndarray, best_chromosome:np.ndarray,
+                    best_score:int, best_fitness:float, history:np.ndarray, rng:random.Random, keep:int=3,
+                    improved_generation:Optional[int]=None) -> Path:
+    ### Saves the state of the training after `generation` generations, population being the next one to play.
+    ### Written to a temporary file first, so a run killed while saving never leaves a corrupted latest checkpoint
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = checkpoint_path(directory, generation)
+    temporary = path.with_suffix('.tmp')
+    with temporary.open('wb') as f:
+        np.savez(
+            f,
+            generation=np.array(generation),
+            population=population,
+            best_chromosome=best_chromosome,
+            best_score=np.array(best_score),
+            best_fitness=np.array(best_fitness),
+            history=history,
+            improved_generation=np.array(generation if improved_generation is None else improved_generation),
+            **rng_state(rng))
+    os.replace(temporary, path)
+    # Only the most recent checkpoints are kept
+    if keep > 0:
+        for old in list_checkpoints(directory)[:-keep]:
+            old.unlink()
+    return path
+
+
+def load_checkpoint(path:Path, rng:random.Random) -> dict:
+    ### Loads a checkpoint and restores the RNGs, returns the rest of the training state
+    with np.load(path) as data:
+        restore_rng_state(rng, data)
+        return {
+            'generation': int(data['generation']),
+            'population': data['population'],
+            'best_chromosome': data['best_chromosome'],
+            'best_score': int(data['best_score']),
+            'best_fitness': float(data['best_fitness']),
+            'history': data['history'],
+            # Checkpoints written before it was saved count from their own generation
+            'improved_generation': int(data['improved_generation'] if 'improved_generation' in data else data['generation']),
+        }
@@ -0,0 +1,59 @@
+import math
+from typing import Optional
+
+import numpy as np
+
+# Genetic algorithm operators working on the whole population at once.
+# A population is a (N, genome_len) float32 matrix, row i being the chromosome of individual i.
+
+
+def crossover_point(genome_len:int) -> int:
+    ### Half / half split of the chromosome (31 for the default 61 genes network)
+    return math.ceil(genome_len / 2)
+
+
+def select_parents(fitness:np.ndarray, count:int) -> np.ndarray:
+    ### Roulette wheel selection of count parents, returns their row indexes
+    total = fitness.sum()
+    if total == 0:
+        cumulative = np.zeros(fitness.shape)
+    else:
+        cumulative = np.cumsum(fitness/total)
+    # First individual whose cumulative fitness is greater than the drawn value
+    parents = np.searchsorted(cumulative, np.random.uniform(size=count), side='right')
+    # Nobody above the drawn value (all scores 0 or float rounding on the last one): fall back to the first individual
+    parents[parents == len(fitness)] = 0
+    return parents
+
+
+def crossover(population:np.ndarray, parents1:np.ndarray, parents2:np.ndarray, point:Optional[int]=None, out:Optional[np.ndarray]=None) -> np.ndarray:
+    ### Ordered crossover: genes before point (default: half of the chromosome) from parents1, the rest from parents2
+    if point is None:
+        point = crossover_point(population.shape[1])
+    if out is None:
+        out = np.empty((len(parents1), population.shape[1]), dtype=population.dtype)
+    out[:, :point] = population[parents1, :point]
+    out[:, point:] = population[parents2, point:]
+    return out
+
+
+def mutate(population:np.ndarray, probability:float, std:float) -> None:
+    ### In place gaussian mutation, each gene mutates with the given probability
+    # Mutation adds or subtracts a random value from a normal distribution (mean=0, std_dev=user_defined)
+    genes_to_mutate = np.random.uniform(size=population.shape) < probability
+    population[genes_to_mutate] += np.random.normal(0, std, size=np.count_nonzero(genes_to_mutate)).astype(population.dtype)
+
+
+def next_generation(population:np.ndarray, fitness:np.ndarray, probability:float, std:float, elite:Optional[np.ndarray]=None, out:Optional[np.ndarray]=None) -> np.ndarray:
+    ### Breeds a new population of the same size: selection, crossover and mutation for all offspring at once.
+    ### If elite is given it is copied (without mutation) as the first individual, out is an optional preallocated buffer
+    offspring = np.empty_like(population) if out is None else out
+    first = 0 if elite is None else 1
+    count = len(population) - first
+    parents1 = select_parents(fitness, count)
+    parents2 = select_parents(fitness, count)
+    crossover(population, parents1, parents2, out=offspring[first:])
+    mutate(offspring[first:], probability, std)
+    if elite is not None:
+        offspring[0] = elite
+    return offspring
@@ -2,82 +2,131 @@ import numpy as np
 import torch
 import torch.nn.modules as nn
 import torch.nn.functional as F
-from typing import Optional
+from typing import Optional, Sequence
+
+# Activations that can be used by the hidden layers (config.yaml: network.activations)
+ACTIVATIONS = {
+    'relu': F.relu,
+    'leaky_relu': F.leaky_relu,
+    'tanh': torch.tanh,
+    'sigmoid': torch.sigmoid,
+}
 
 class FF(nn.Module):
     # Inputs:
-    #   - Flappy Y coord 
+    #   - Flappy Y coord
     #   - Bottom pipe X coord
     #   - Bottom pipe Y coord
     #   - Top pipe X coord
     #   - Top pipe Y coord
-    # Outputs: 
-    #   - Jump
+    # Hidden layers:
+    #   - hidden_layers[i] neurons with activations[i] (default: 6 and 3 neurons, relu)
+    # Outputs:
+    #   - Jump (sigmoid)
 
-    def __init__(self, chromosome:Optional[torch.Tensor]=None):
+    def __init__(self, chromosome:Optional[torch.Tensor]=None, hidden_layers:Sequence[int]=(6, 3), activations:Optional[Sequence[str]]=None):
         super().__init__()
         self.input_size = 5
         self.num_classes = 1
-        self.fc1 = nn.Linear(self.input_size, 6)
-        self.fc2 = nn.Linear(6, 3)
-        self.fc3 = nn.Linear(3, self.num_classes)
-        self.fc1.requires_grad_(False)
-        self.fc2.requires_grad_(False)
-        self.fc3.requires_grad_(False)
-        self.last_activations = {
-            'input': np.zeros(5),
-            'fc1': np.zeros(6),
-            'fc2': np.zeros(3),
-            'fc3': 0
-        }
+        self.hidden_layers = list(hidden_layers)
+        if activations is None:
+            activations = ['relu'] * len(self.hidden_layers)
+        if len(activations) != len(self.hidden_layers):
+            raise ValueError(f'Expected one activation per hidden layer ({len(self.hidden_layers)}), got {len(activations)}')
+        self.activations = [ACTIVATIONS[name] for name in activations] + [torch.sigmoid]
+        # Layers are named fc1 ... fcN (N = output layer), the same keys used by the saved .pth files
+        self.sizes = [self.input_size, *self.hidden_layers, self.num_classes]
+        self.layers = []
+        for i, (in_size, out_size) in enumerate(zip(self.sizes[:-1], self.sizes[1:]), start=1):
+            layer = nn.Linear(in_size, out_size)
+            self.add_module(f'fc{i}', layer)
+            self.layers.append(layer)
+        self.names = ['input'] + [f'fc{i}' for i in range(1, len(self.layers)+1)]
+        # All weights and bias live in a single flat buffer (the chromosome), the layer parameters are views into it
+        params = [(f'{kind}{i}', layer, name) for i, layer in enumerate(self.layers, start=1) for kind, name in (('w', 'weight'), ('b', 'bias'))]
+        self.genome = torch.cat([getattr(layer, name).detach().flatten() for _, layer, name in params])
+        self.layout = [] # (key, shape, start, end) in chromosome order, computed once
+        offset = 0
+        for key, layer, name in params:
+            shape = getattr(layer, name).shape
+            end = offset + shape.numel()
+            setattr(layer, name, torch.nn.parameter.Parameter(self.genome[offset:end].view(shape), requires_grad=False))
+            self.layout.append((key, shape, offset, end))
+            offset = end
+        self.last_activations = {name: np.zeros(size) for name, size in zip(self.names, self.sizes)}
+        self.last_activations[self.names[-1]] = 0
         if chromosome is not None:
             self.load_chromosome(chromosome)
 
     def forward(self, x):
+        x = torch.as_tensor(x)
         self.last_activations['input'] = x.detach().numpy().copy()
-        x = F.relu(self.fc1(x))
-        self.last_activations['fc1'] = x.detach().numpy().copy()
-        x = F.relu(self.fc2(x))
-        self.last_activations['fc2'] = x.detach().numpy().copy()
-        x = F.sigmoid(self.fc3(x))
-        self.last_activations['fc3'] = x.item()
+        for name, layer, activation in zip(self.names[1:], self.layers, self.activations):
+            x = activation(layer(x))
+            self.last_activations[name] = x.detach().numpy().copy()
+        self.last_activations[self.names[-1]] = x.item()
         return x
 
-    def to_chromosome(self):
-        ### Encode the neural network weights and bias into a 1d vector 
-        w1 = self.fc1.weight.flatten()
-        b1 = self.fc1.bias.flatten()
-        w2 = self.fc2.weight.flatten()
-        b2 = self.fc2.bias.flatten()
-        w3 = self.fc3.weight.flatten()
-        b3 = self.fc3.bias.flatten()
-        return torch.cat((w1,b1,w2,b2,w3,b3), dim=0)
-
-    def chromosome2dict(self, data):
-        ### Decode the 1d vector into a dictionary format
-        w1_idx = np.prod(self.fc1.weight.shape) # count the number of weights on layer fc1
-        b1_idx = w1_idx + np.prod(self.fc1.bias.shape) # count the number of bias values on layer fc1
-        w2_idx = b1_idx + np.prod(self.fc2.weight.shape)
-        b2_idx = w2_idx + np.prod(self.fc2.bias.shape)
-        w3_idx = b2_idx + np.prod(self.fc3.weight.shape)
-        b3_idx = w3_idx + np.prod(self.fc3.bias.shape)
+    def to_chromosome(self) -> torch.Tensor:
+        ### Encode the neural network weights and bias into a 1d vector.
+        ### Zero-copy: the returned tensor is the network's own storage
+        return self.genome
 
-        return {
-            'w1': torch.reshape(data[0:w1_idx], self.fc1.weight.shape),
-            'b1': torch.reshape(data[w1_idx:b1_idx], self.fc1.bias.shape),
-            'w2': torch.reshape(data[b1_idx:w2_idx], self.fc2.weight.shape),
-            'b2': torch.reshape(data[w2_idx:b2_idx], self.fc2.bias.shape),
-            'w3': torch.reshape(data[b2_idx:w3_idx], self.fc3.weight.shape),
-            'b3': torch.reshape(data[w3_idx:b3_idx], self.fc3.bias.shape),
-        }
+    def chromosome2dict(self, data:torch.Tensor) -> dict:
+        ### Decode the 1d vector into a dictionary format (views into data)
+        return {key: data[start:end].reshape(shape) for key, shape, start, end in self.layout}
 
     def load_from_dict(self, wb:dict) -> None:
-        self.fc1.weight = torch.nn.parameter.Parameter(wb['w1'])
-        self.fc1.bias = torch.nn.parameter.Parameter(wb['b1'])
-        self.fc2.weight = torch.nn.parameter.Parameter(wb['w2'])
-        self.fc2.bias = torch.nn.parameter.Parameter(wb['b2'])
-        self.fc3.weight = torch.nn.parameter.Parameter(wb['w3'])
-        self.fc3.bias = torch.nn.parameter.Parameter(wb['b3'])
+        views = self.chromosome2dict(self.genome)
+        for key, value in wb.items():
+            views[key].copy_(value)
 
     def load_chromosome(self, chromosome:torch.Tensor) -> None:
-        self.load_from_dict(self.chromosome2dict(chromosome))
\ No newline at end of file
+        self.genome.copy_(torch.as_tensor(chromosome))
+
+class FFPopulation:
+    ### Batched FF: holds the weights of a whole population stacked as (N, out, in) tensors
+    ### and evaluates every network at once with one batched matmul per layer
+
+    def __init__(self, chromosomes:torch.Tensor, **network):
+        self.reference = FF(**network) # only used for the layer shapes, activations and the chromosome layout
+        self.load_chromosomes(chromosomes)
+
+    def __len__(self) -> int:
+        return self.chromosomes.shape[0]
+
+    def load_chromosomes(self, chromosomes:torch.Tensor) -> None:
+        ### chromosomes: (N, genome_len) tensor, row i is FF.to_chromosome() of individual i
+        self.chromosomes = chromosomes.detach()
+        size = chromosomes.shape[0]
+        # Views (not copies) into the rows, so writing new chromosomes in place updates the networks
+        views = {key: self.chromosomes[:, start:end].view(size, *shape) for key, shape, start, end in self.reference.layout}
+        self.layers = [(views[f'w{i}'], views[f'b{i}'].unsqueeze(2)) for i in range(1, len(self.reference.layers)+1)]
+        self.last_idx = np.zeros(0, dtype=np.int64)
+        self.last_activations = {}
+
+    def forward(self, x:torch.Tensor, idx:np.ndarray) -> torch.Tensor:
+        ### x: (len(idx), 5) inputs for the individuals idx, returns their (len(idx),) outputs
+        idx = torch.from_numpy(idx)
+        activations = {'input': x}
+        x = x.unsqueeze(2)
+        for name, (w, b), activation in zip(self.reference.names[1:], self.layers, self.reference.activations):
+            x = activation(torch.baddbmm(b[idx], w[idx], x))
+            activations[name] = x.squeeze(2)
+        self.last_idx = idx.numpy()
+        self.last_activations = activations
+        return x.view(-1)
+
+    def jump_mask(self, x:np.ndarray, alive:np.ndarray) -> np.ndarray:
+        ### x: inputs of the alive individuals (in index order), returns a (N,) mask of who jumps
+        x = torch.as_tensor(x)
+        jump = np.zeros(alive.shape, dtype=bool)
+        idx = np.flatnonzero(alive)
+        if idx.size:
+            jump[idx] = (self.forward(x, idx) > 0.5).numpy()
+        return jump
+
+    def last_state_arrays(self, individual:int) -> tuple:
+        ### Zero-copy state of an individual of the last forward: its chromosome and the activations of every layer (input to output), as numpy views
+        row = int(np.searchsorted(self.last_idx, individual))
+        return self.chromosomes[individual].numpy(), [self.last_activations[name][row].numpy() for name in self.reference.names]
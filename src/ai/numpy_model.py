@@ -0,0 +1,135 @@
+import numpy as np
+from typing import Optional, Sequence
+
+# Same networks as model.py (FF and FFPopulation, same chromosome layout and activations) evaluated with plain numpy.
+# A 5 -> 6 -> 3 -> 1 network is a few dozen multiply-adds, far less than the per call overhead of torch,
+# and without torch each process (e.g. the parallel evaluation workers) starts faster and uses much less memory.
+
+# Activations that can be used by the hidden layers (config.yaml: network.activations)
+ACTIVATIONS = {
+    'relu': lambda x: np.maximum(x, 0),
+    'leaky_relu': lambda x: np.where(x > 0, x, np.float32(0.01) * x),
+    'tanh': np.tanh,
+    # Written with tanh so large negative inputs don't overflow exp
+    'sigmoid': lambda x: np.float32(0.5) * (1 + np.tanh(np.float32(0.5) * x)),
+}
+
+
+def chromosome_layout(sizes:Sequence[int]) -> list:
+    ### (key, shape, start, end) of the weights and bias of each layer in the chromosome, the same as FF.layout
+    layout = []
+    offset = 0
+    for i, (in_size, out_size) in enumerate(zip(sizes[:-1], sizes[1:]), start=1):
+        for key, shape in ((f'w{i}', (out_size, in_size)), (f'b{i}', (out_size,))):
+            end = offset + int(np.prod(shape))
+            layout.append((key, shape, offset, end))
+            offset = end
+    return layout
+
+
+class NumpyFF:
+    ### Feed forward network with the weights and bias stored in a single float32 numpy chromosome
+
+    def __init__(self, chromosome:Optional[np.ndarray]=None, hidden_layers:Sequence[int]=(6, 3), activations:Optional[Sequence[str]]=None):
+        self.input_size = 5
+        self.num_classes = 1
+        self.hidden_layers = list(hidden_layers)
+        if activations is None:
+            activations = ['relu'] * len(self.hidden_layers)
+        if len(activations) != len(self.hidden_layers):
+            raise ValueError(f'Expected one activation per hidden layer ({len(self.hidden_layers)}), got {len(activations)}')
+        self.activations = [ACTIVATIONS[name] for name in activations] + [ACTIVATIONS['sigmoid']]
+        self.sizes = [self.input_size, *self.hidden_layers, self.num_classes]
+        self.names = ['input'] + [f'fc{i}' for i in range(1, len(self.sizes))]
+        self.layout = chromosome_layout(self.sizes)
+        self.genome = np.zeros(self.layout[-1][3], dtype=np.float32)
+        # (weight, bias) views into the chromosome
+        views = self.chromosome2dict(self.genome)
+        self.layers = [(views[f'w{i}'], views[f'b{i}']) for i in range(1, len(self.sizes))]
+        self.last_activations = {name: np.zeros(size) for name, size in zip(self.names, self.sizes)}
+        self.last_activations[self.names[-1]] = 0
+        # Without chromosome the weights are zeros, random_chromosomes is the initialization
+        if chromosome is not None:
+            self.load_chromosome(chromosome)
+
+    def forward(self, x:np.ndarray) -> np.ndarray:
+        self.last_activations['input'] = np.array(x)
+        for name, (w, b), activation in zip(self.names[1:], self.layers, self.activations):
+            x = activation(w @ x + b)
+            self.last_activations[name] = x.copy()
+        self.last_activations[self.names[-1]] = x.item()
+        return x
+
+    __call__ = forward
+
+    def to_chromosome(self) -> np.ndarray:
+        ### Zero-copy: the returned array is the network's own storage
+        return self.genome
+
+    def chromosome2dict(self, data:np.ndarray) -> dict:
+        ### Decode the 1d vector into a dictionary format (views into data)
+        return {key: data[start:end].reshape(shape) for key, shape, start, end in self.layout}
+
+    def load_chromosome(self, chromosome:np.ndarray) -> None:
+        self.genome[:] = chromosome
+
+    @classmethod
+    def random_chromosomes(cls, size:int, hidden_layers:Sequence[int]=(6, 3), activations:Optional[Sequence[str]]=None) -> np.ndarray:
+        ### (size, genome_len) matrix of chromosomes of freshly initialized networks.
+        ### Same initialization as torch's nn.Linear, U(-1/sqrt(fan_in), 1/sqrt(fan_in)) for weights and bias, and each layer is contiguous in the chromosome
+        sizes = [5, *hidden_layers, 1]
+        genes = []
+        for in_size, out_size in zip(sizes[:-1], sizes[1:]):
+            bound = 1 / np.sqrt(in_size)
+            genes.append(np.random.uniform(-bound, bound, size=(size, (in_size + 1) * out_size)))
+        return np.concatenate(genes, axis=1).astype(np.float32)
+
+
+class NumpyPopulation:
+    ### Batched NumpyFF, the numpy version of FFPopulation: the weights of the whole population are (N, out, in) views
+    ### into the chromosomes matrix and every network is evaluated at once with one batched matmul per layer
+
+    def __init__(self, chromosomes:np.ndarray, **network):
+        self.reference = NumpyFF(**network) # only used for the layer shapes, activations and the chromosome layout
+        self.load_chromosomes(chromosomes)
+
+    def __len__(self) -> int:
+        return self.chromosomes.shape[0]
+
+    def load_chromosomes(self, chromosomes:np.ndarray) -> None:
+        ### chromosomes: (N, genome_len) float32 matrix, row i is the chromosome of individual i
+        self.chromosomes = chromosomes
+        size = chromosomes.shape[0]
+        # Views (not copies) into the rows, so writing new chromosomes in place updates the networks
+        views = {key: chromosomes[:, start:end].reshape(size, *shape) for key, shape, start, end in self.reference.layout}
+        self.layers = [(views[f'w{i}'], views[f'b{i}']) for i in range(1, len(self.reference.sizes))]
+        self.last_idx = np.zeros(0, dtype=np.int64)
+        self.last_activations = {}
+
+    def forward(self, x:np.ndarray, idx:np.ndarray) -> np.ndarray:
+        ### x: (len(idx), 5) inputs for the individuals idx, returns their (len(idx),) outputs
+        everyone = len(idx) == len(self)
+        activations = {'input': x}
+        x = x[:, :, None]
+        for name, (w, b), activation in zip(self.reference.names[1:], self.layers, self.reference.activations):
+            # Selecting the alive individuals copies their weights, skipped while everyone is alive
+            if not everyone:
+                w, b = w[idx], b[idx]
+            x = activation(np.matmul(w, x) + b[:, :, None])
+            activations[name] = x[:, :, 0]
+        self.last_idx = idx
+        self.last_activations = activations
+        return x.reshape(-1)
+
+    def jump_mask(self, x:np.ndarray, alive:np.ndarray) -> np.ndarray:
+        ### x: inputs of the alive individuals (in index order), returns a (N,) mask of who jumps
+        jump = np.zeros(alive.shape, dtype=bool)
+        idx = np.flatnonzero(alive)
+        if idx.size:
+            jump[idx] = self.forward(x, idx) > 0.5
+        return jump
+
+    def last_state_arrays(self, individual:int) -> tuple:
+        ### Zero-copy state of an individual of the last forward: its chromosome and the activations of every layer (input to output)
+        row = int(np.searchsorted(self.last_idx, individual))
+        return self.chromosomes[individual], [self.last_activations[name][row] for name in self.reference.names]
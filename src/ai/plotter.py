@@ -1,33 +1,98 @@
 import itertools
-import matplotlib.animation as animation
 import matplotlib.pyplot as plt
 import multiprocessing as mp
 import numpy as np
-import queue
+import time
 from functools import partial
+from multiprocessing import shared_memory
 from matplotlib.collections import PathCollection
 from matplotlib.colors import hsv_to_rgb
-from typing import Any
+from typing import Optional, Sequence
+
+class SharedState:
+    ### Ring of network states (weights, bias and activations of every layer) in shared memory.
+    ### The trainer writes them in place and the plotter process reads them without any pickling.
+    ### Fixed float64 layout: [sequence number of the latest state] + slots rows of [sequence, chromosome, activations]
+    ### A slot holds -1 while it is written, so the reader can tell a state that was overwritten while copied
+
+    def __init__(self, genome_len:int, sizes:Sequence[int], slots:int=4, name:Optional[str]=None) -> None:
+        self.genome_len = genome_len
+        self.sizes = list(sizes)
+        self.row_len = 1 + genome_len + sum(self.sizes)
+        nbytes = 8 * (1 + slots * self.row_len)
+        self.owner = name is None
+        self.memory = shared_memory.SharedMemory(name=name, create=self.owner, size=nbytes)
+        buffer = np.ndarray((1 + slots * self.row_len,), dtype=np.float64, buffer=self.memory.buf)
+        self.header = buffer[:1]
+        self.slots = buffer[1:].reshape(slots, self.row_len)
+        if self.owner:
+            buffer.fill(0)
+        self.last_read = 0
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def write(self, chromosome:np.ndarray, activations:Sequence[np.ndarray]) -> None:
+        ### chromosome: 1d genes, activations: one array per layer (input to output)
+        sequence = int(self.header[0]) + 1
+        slot = self.slots[sequence % len(self.slots)]
+        slot[0] = -1
+        slot[1:1+self.genome_len] = chromosome
+        offset = 1 + self.genome_len
+        for activation, size in zip(activations, self.sizes):
+            slot[offset:offset+size] = activation
+            offset += size
+        slot[0] = sequence
+        self.header[0] = sequence
+
+    def read(self) -> Optional[tuple[np.ndarray, list[np.ndarray]]]:
+        ### Latest state not read yet, as (chromosome, activations) copies, or None
+        sequence = int(self.header[0])
+        if sequence == self.last_read:
+            return None
+        slot = self.slots[sequence % len(self.slots)]
+        data = slot.copy()
+        if data[0] != sequence or slot[0] != sequence:
+            return None # overwritten while copying, a newer state is already there
+        self.last_read = sequence
+        bounds = np.cumsum([1 + self.genome_len] + self.sizes)
+        return data[1:1+self.genome_len], np.split(data[bounds[0]:bounds[-1]], bounds[1:-1] - bounds[0])
+
+    def close(self) -> None:
+        # numpy views must be released before the memory is closed
+        del self.header, self.slots
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
 
 class NetworkPlotter:
-    def __init__(self) -> None:
-        self.plot_queue = mp.Queue(1)
-        self.process = mp.Process(target=NetworkPlotter.subprocess, args=(self.plot_queue,))
+    def __init__(self, sizes:list[int], layout:list, fps:float=10) -> None:
+        # sizes: number of neurons of each layer, from the input to the output layer
+        # layout: FF.layout, where the weights and bias of each layer are in the chromosome
+        # fps: maximum number of updates per second written for the plotter process
+        self.interval = 1 / fps
+        self.last_update = -float('inf')
+        layout = [(key, tuple(shape), start, end) for key, shape, start, end in layout]
+        self.shared = SharedState(layout[-1][3], sizes)
+        self.process = mp.Process(target=NetworkPlotter.subprocess, args=(self.shared.name, sizes, layout))
         self.process.start()
-    
-    def update(self, activations: dict[str, Any]):
-        try:
-            self.plot_queue.put_nowait(activations)
-        except queue.Full:
-            self.plot_queue.get_nowait()
-            self.plot_queue.put_nowait(activations)
 
-    def subprocess(plot_queue):
+    def due(self) -> bool:
+        ### True once the interval since the last update elapsed
+        return time.perf_counter() - self.last_update >= self.interval
+
+    def update(self, chromosome:np.ndarray, activations:Sequence[np.ndarray]) -> None:
+        ### Writes the state of the watched individual in place, nothing is sent to the plotter process
+        self.last_update = time.perf_counter()
+        self.shared.write(chromosome, activations)
+
+    def subprocess(shared_name, sizes, layout):
+        # Layers are 20 units apart and their neurons 5 units apart, centered at y = 15
+        layers = ['input'] + [f'fc{i}' for i in range(1, len(sizes))]
         neuron_coords = {
-            'input': tuple(zip(np.repeat(5, 5), np.arange(5,26,5))),
-            'fc1': tuple(zip(np.repeat(25, 6), np.arange(2.5,28,5))),
-            'fc2': tuple(zip(np.repeat(45, 3), np.arange(10,21,5))),
-            'output': ((65,15),)
+            layer: tuple(zip(np.repeat(5 + 20*i, size), 15 + 5*(np.arange(size) - (size-1)/2)))
+            for i, (layer, size) in enumerate(zip(layers, sizes))
         }
 
         neuron_x = [item for row in map(lambda a: [x[0] for x in a], neuron_coords.values()) for item in row]
@@ -35,7 +100,6 @@ class NetworkPlotter:
         fig, ax = plt.subplots()
         ax.set_axis_off()
         # Plot connections
-        layers = ['input', 'fc1', 'fc2', 'output']
         plot_connections = {layer: dict() for layer in layers}
         for i in range(len(layers)-1):
             back_layer = neuron_coords[layers[i]]
@@ -54,41 +118,90 @@ class NetworkPlotter:
         #for x, text, spaces in zip([5, 25, 45, 65], ['Input', 'Hidden Layer 1\n   activation', 'Hidden Layer 2\n   activation', ''], [7, 3, 3, 0]):
             #ax.axvline(x=x, color="black", linestyle='--', alpha=0.5, zorder=0)
             #ax.text(x+spaces, 30, text, zorder=0)
-        # Plot neurons
-        plot_neurons = ax.scatter(neuron_x, neuron_y, s=400, facecolors='w', edgecolors='k', lw=1, zorder=1)
+        # Plot neurons, the only artist redrawn every frame (blitted over a cached background with the connections)
+        plot_neurons = ax.scatter(neuron_x, neuron_y, s=400, facecolors='w', edgecolors='k', lw=1, zorder=1, animated=True)
 
-        ani = animation.FuncAnimation(fig, partial(NetworkPlotter.animate, neurons=plot_neurons, connections=plot_connections, queue=plot_queue), interval=5)
+        try:
+            shared = SharedState(layout[-1][3], sizes, name=shared_name)
+        except FileNotFoundError:
+            return # the trainer already quit and released the shared memory
+        drawn = {'background': None}
+        fig.canvas.mpl_connect('draw_event', partial(NetworkPlotter.on_draw, neurons=plot_neurons, drawn=drawn))
+        timer = fig.canvas.new_timer(interval=5)
+        timer.add_callback(partial(NetworkPlotter.animate, neurons=plot_neurons, connections=plot_connections, layers=layers, shared=shared, layout=layout, drawn=drawn))
+        timer.start()
         plt.show()
+        timer.stop()
+        shared.close()
 
-    def animate(frame, neurons:PathCollection=None, connections=None, queue=None):
-        weight2layer = {
-            'w1': 'input',
-            'w2': 'fc1',
-            'w3': 'fc2'
-        }
-        data = queue.get()
-        activations = data['last_activations']
-        wb = data['wb']
-        for w in ['w1', 'w2', 'w3']:
-            for cons, weights in zip(connections[weight2layer[w]].values(), wb[w].T):
+    def on_draw(event, neurons:PathCollection=None, drawn=None):
+        # Full redraws (first show, resize, new weights) skip the animated neurons: the result is the background to blit over
+        canvas = neurons.figure.canvas
+        drawn['background'] = canvas.copy_from_bbox(neurons.figure.bbox)
+        neurons.axes.draw_artist(neurons)
+
+    def restyle_connections(connections, weight2layer:dict, wb:dict) -> bool:
+        ### Colors and widths the lines from the weights wb, True if any line changed
+        changed = False
+        for w, layer in weight2layer.items():
+            if w not in wb:
+                continue
+            for cons, weights in zip(connections[layer].values(), wb[w].T):
                 for con, weight in zip(cons, weights):
-                    con.set_color('g' if weight > 0 else 'r')
-                    con.set_linewidth(1 + 3 * abs(weight))
+                    color = 'g' if weight > 0 else 'r'
+                    linewidth = 1 + 3 * abs(weight)
+                    if con.get_color() != color or con.get_linewidth() != linewidth:
+                        con.set_color(color)
+                        con.set_linewidth(linewidth)
+                        changed = True
+        return changed
+
+    def neuron_colors(activations:dict, layers:list) -> np.ndarray:
+        ### RGB facecolor of every neuron, from the input to the output layer
         facecolors = []
         activation2rgb = lambda activation, threshold=0, fixsaturation=False: hsv_to_rgb((0 if activation < threshold else 1/3, 1 if fixsaturation else abs(activation), 1))
         # Input Data
         for activation, (act_min, act_max) in zip(activations['input'], [(-100,513),(0,500),(-100,513),(0,500),(-513,0)]):
             activation_ = 2*(activation-act_min)/(act_max-act_min)-1
-            if abs(activation_) > 1:
-                print()
             facecolors.append(activation2rgb(activation_))
-        # Activations of hidden layers 1 and 2
-        for activation in [*activations['fc1'], *activations['fc2']]:
-            activation = max(-1,min(1,activation))
-            facecolors.append(activation2rgb(activation))
+        # Activations of hidden layers
+        for layer in layers[1:-1]:
+            for activation in activations[layer]:
+                activation = max(-1,min(1,activation))
+                facecolors.append(activation2rgb(activation))
         # Output
-        facecolors.append(activation2rgb(max(0,min(1,activations['fc3'])), threshold=0.5, fixsaturation=True))
+        facecolors.append(activation2rgb(max(0,min(1,activations[layers[-1]])), threshold=0.5, fixsaturation=True))
+        return np.array(facecolors)
+
+    def animate(neurons:PathCollection=None, connections=None, layers=None, shared:SharedState=None, layout=None, drawn=None):
+        # Weights w{i} connect layers[i-1] to layers[i]
+        weight2layer = {f'w{i}': layer for i, layer in enumerate(layers[:-1], start=1)}
+        # Never blocks the window: without a new state the last one stays on screen
+        state = shared.read()
+        if state is None:
+            return
+        chromosome, layer_activations = state
+        activations = dict(zip(layers, layer_activations))
+        activations[layers[-1]] = activations[layers[-1]].item()
+        # The connections are only updated when the weights changed (new individual or generation), and
+        # only the lines whose color or width changed. They are part of the background, redrawn in full
+        if not np.array_equal(chromosome, drawn.get('chromosome')):
+            drawn['chromosome'] = chromosome
+            wb = {key: chromosome[start:end].reshape(shape) for key, shape, start, end in layout}
+            if NetworkPlotter.restyle_connections(connections, weight2layer, wb):
+                neurons.figure.canvas.draw_idle()
+        facecolors = NetworkPlotter.neuron_colors(activations, layers)
+        if np.array_equal(facecolors, drawn.get('facecolors')):
+            return
+        drawn['facecolors'] = facecolors
         neurons.set_facecolor(facecolors)
+        if drawn['background'] is None:
+            return # not shown yet, the first full draw will show them
+        # Blitting: the cached background is restored and only the neurons are drawn again
+        canvas = neurons.figure.canvas
+        canvas.restore_region(drawn['background'])
+        neurons.axes.draw_artist(neurons)
+        canvas.blit(neurons.figure.bbox)
         #for layer in ['input', 'fc1', 'fc2']:
         #    for i, (cons, activation) in enumerate(zip(connections[layer].values(), data[layer])):
         #        if layer != 'input':
@@ -104,4 +217,5 @@ class NetworkPlotter:
         #neurons.set_facecolor(['w' for _ in range(14)] + ['g' if data['fc3'] > 0.5 else 'r'])
     
     def __del__(self):
-        self.process.terminate()
\ No newline at end of file
+        self.process.terminate()
+        self.shared.close()
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""Training throughput benchmark.
+
+Plays fixed-seed generations at several population sizes and reports, as JSON,
+frames/sec, bird-frames/sec, generations/min, the time spent in each phase of
+the loop (collision, inference, physics, rendering, display, breeding) and the peak
+memory of each run.
+
+    python -m src.benchmark --sizes 50 200 1000 10000 --generations 5 --output bench.json
+
+Every population size runs in its own process, so the peak memory reported is
+the one of that size alone (null on windows, where it is not measured). Runs
+are headless unless --render is given, and use the numpy network backend unless
+--backend torch is given.
+"""
+import argparse
+import json
+import multiprocessing as mp
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .ai import backend, genetic
+from .episode import Episode
+from .utils import GameConfig, Profiler
+
+
+def peak_memory_mb() -> Optional[float]:
+    """peak resident memory of the current process, in MiB (None on windows)"""
+    try:
+        import resource  # POSIX only
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB on linux
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def run(
+    size: int,
+    generations: int,
+    max_frames: int,
+    seed: int,
+    render: bool = False,
+    network: Optional[dict] = None,
+) -> Dict[str, Any]:
+    """plays generations of a population of the given size and times them"""
+    network = network or {}
+    backend.manual_seed(seed, network.get("backend", "numpy"))
+    config = GameConfig.create_headless(fps=30, seed=seed)
+    # Drawing is still done on the dummy display, but nothing waits for the fps cap
+    config.headless = not render
+    profiler = Profiler()
+    population = backend.random_chromosomes(
+        size, network.get("hidden_layers", (6, 3)), network.get("activations")
+    )
+    offspring = np.empty_like(population)
+    brains = backend.create_population(population, **network)
+    episode = Episode(
+        config, brains, seed=seed, profiler=profiler, max_frames=max_frames
+    )
+
+    frames = 0
+    bird_frames = 0
+    start = time.perf_counter()
+    for generation in range(generations):
+        # Same levels on every run, so the sizes (and different commits) can be compared
+        episode.reset(seed + generation)
+        while not episode.done:
+            bird_frames += episode.flock.num_alive
+            episode.step()
+            if render:
+                with profiler.phase("display"):
+                    config.renderer.present()
+        episode.finish()
+        frames += episode.frame
+        with profiler.phase("breeding"):
+            genetic.next_generation(
+                population, episode.fitness, 0.05, 0.3, out=offspring
+            )
+            population[:] = offspring
+    elapsed = time.perf_counter() - start
+
+    return {
+        "population_size": size,
+        "generations": generations,
+        "frames": frames,
+        "seconds": elapsed,
+        "frames_per_second": frames / elapsed,
+        "bird_frames_per_second": bird_frames / elapsed,
+        "generations_per_minute": 60 * generations / elapsed,
+        "backend": network.get("backend", "numpy"),
+        "phases": {
+            name: {
+                "seconds": phase["seconds"],
+                "ms_per_frame": phase["ms_per_frame"],
+            }
+            for name, phase in profiler.summary().items()
+        },
+        "peak_memory_mb": peak_memory_mb(),
+    }
+
+
+def _init_worker(network_backend: str) -> None:
+    backend.set_num_threads(1, network_backend)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[50, 200, 1000, 10000]
+    )
+    parser.add_argument("--generations", type=int, default=3)
+    parser.add_argument(
+        "--max-frames",
+        type=int,
+        default=2000,
+        help="frame cap of each generation, so good populations do not play forever",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--render", action="store_true", help="also time drawing"
+    )
+    parser.add_argument("--backend", choices=backend.BACKENDS, default="numpy")
+    parser.add_argument(
+        "--output", help="JSON file to write, printed if not given"
+    )
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        # A fresh single threaded process per size: isolated peak memory and comparable timings
+        with ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(args.backend,),
+        ) as pool:
+            result = pool.submit(
+                run,
+                size,
+                args.generations,
+                args.max_frames,
+                args.seed,
+                args.render,
+                {"backend": args.backend},
+            ).result()
+        memory = result["peak_memory_mb"]
+        print(
+            f"{size:>6} birds: {result['frames_per_second']:9.1f} frames/s"
+            f" {result['bird_frames_per_second']:12.1f} bird-frames/s"
+            f" {result['generations_per_minute']:8.1f} generations/min"
+            + (f" {memory:8.1f} MiB" if memory is not None else ""),
+            file=sys.stderr,
+        )
+        results.append(result)
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "settings": vars(args),
+        "results": results,
+    }
+    if args.backend == "torch":
+        import torch
+
+        report["torch"] = torch.__version__
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
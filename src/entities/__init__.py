@@ -2,8 +2,9 @@ from .background import Background
 from .entity import Entity
 from .floor import Floor
 from .game_over import GameOver
-from .pipe import Pipe, Pipes
+from .pipe import Pipe, Pipes, PipeSequence
 from .flappy import Flappy, FlappyMode
+from .flock import Flock
 from .score import Score
 from .welcome_message import WelcomeMessage
 
@@ -12,7 +13,9 @@ __all__ = [
     "Floor",
     "Pipe",
     "Pipes",
+    "PipeSequence",
     "Flappy",
+    "Flock",
     "Score",
     "Entity",
     "WelcomeMessage",
@@ -12,3 +12,7 @@ class Background(Entity):
             config.window.width,
             config.window.height,
         )
+
+    def draw(self) -> None:
+        # cached by the renderer, which only restores the regions drawn over
+        self.config.renderer.draw_background(self.image)
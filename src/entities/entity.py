@@ -58,7 +58,18 @@ class Entity:
             self.rect, other.rect, self.hit_mask, other.hit_mask
         )
 
+    def update(self) -> None:
+        """advances the entity state by one frame (no rendering)"""
+        pass
+
     def tick(self) -> None:
+        self.update()
+        if self.config.headless:
+            return
+        self.render()
+
+    def render(self) -> None:
+        """draws the entity, plus its rect and coordinates in debug mode"""
         self.draw()
         rect = self.rect
         if self.config.debug:
@@ -80,4 +91,4 @@ class Entity:
 
     def draw(self) -> None:
         if self.image:
-            self.config.screen.blit(self.image, self.rect)
+            self.config.renderer.blit(self.image, self.rect)
@@ -1,8 +1,6 @@
 from enum import Enum
 from itertools import cycle
 
-import pygame
-
 from ..utils import GameConfig, clamp
 from .entity import Entity
 from .floor import Floor
@@ -21,9 +19,16 @@ class Flappy(Entity):
         x = int(config.window.width * 0.2)
         y = int((config.window.height - image.get_height()) / 2)# + 100*random() * (-1 if random() > 0.5 else 1) # For testing multiple players
         super().__init__(config, image, x, y)
+        self.start_y = y
         self.min_y = -2 * self.h
         self.max_y = config.window.viewport_height - self.h * 0.75
+        self.reset()
+
+    def reset(self) -> None:
+        """puts the bird back at the start position, reusing its surfaces and hit mask"""
+        self.y = self.start_y
         self.img_idx = 0
+        self.image = self.config.images.player[self.img_idx]
         self.img_gen = cycle([0, 1, 2, 1])
         self.frame = 0
         self.crashed = False
@@ -115,7 +120,7 @@ class Flappy(Entity):
     def rotate(self) -> None:
         self.rot = clamp(self.rot + self.vel_rot, self.rot_min, self.rot_max)
 
-    def draw(self) -> None:
+    def update(self) -> None:
         self.update_image()
         if self.mode == FlappyMode.SHM:
             self.tick_shm()
@@ -124,12 +129,13 @@ class Flappy(Entity):
         elif self.mode == FlappyMode.CRASH:
             self.tick_crash()
 
+    def draw(self) -> None:
         self.draw_flappy()
 
     def draw_flappy(self) -> None:
-        rotated_image = pygame.transform.rotate(self.image, self.rot)
+        rotated_image = self.config.images.rotated_player(self.img_idx, self.rot)
         rotated_rect = rotated_image.get_rect(center=self.rect.center)
-        self.config.screen.blit(rotated_image, rotated_rect)
+        self.config.renderer.blit(rotated_image, rotated_rect)
 
     def stop_wings(self) -> None:
         self.img_gen = cycle([self.img_idx])
@@ -153,13 +159,12 @@ class Flappy(Entity):
             self.crash_entity = "floor"
             return True
 
-        for pipe in pipes.upper:
-            if self.collide(pipe):
-                self.crashed = True
-                self.crash_entity = "pipe"
-                return True
-        for pipe in pipes.lower:
-            if self.collide(pipe):
+        for upper, lower in zip(pipes.upper, pipes.lower):
+            # both pipes of a pair share the same x, skip pairs outside the bird column
+            rect = upper.rect
+            if rect.right <= self.x or rect.left >= self.x + self.w:
+                continue
+            if self.collide(upper) or self.collide(lower):
                 self.crashed = True
                 self.crash_entity = "pipe"
                 return True
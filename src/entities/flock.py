@@ -0,0 +1,157 @@
+from itertools import cycle
+from typing import Optional
+
+import numpy as np
+import pygame
+
+from ..utils import GameConfig
+from .entity import Entity
+from .floor import Floor
+from .pipe import Pipes
+
+
+class Flock(Entity):
+    """A whole population of birds simulated at once.
+
+    Every bird shares the same x coordinate, sprite and physics constants as
+    Flappy in NORMAL mode, so only the per bird state (y, vel_y, rot, flapped,
+    alive, score, frames survived and distance to the gap at death) is kept,
+    each as a contiguous numpy array indexed by the bird's position in the
+    population.
+    """
+
+    def __init__(self, config: GameConfig, size: int) -> None:
+        image = config.images.player[0]
+        x = int(config.window.width * 0.2)
+        y = int((config.window.height - image.get_height()) / 2)
+        super().__init__(config, image, x, y)
+        self.size = size
+        self.start_y = y
+        self.min_y = -2 * self.h
+        self.max_y = config.window.viewport_height - self.h * 0.75
+        # Same constants as Flappy.reset_vals_normal
+        self.max_vel_y = 10  # max vel along Y, max descend speed
+        self.acc_y = 1  # players downward acceleration
+        self.vel_rot = -3  # player's rotation speed
+        self.rot_min = -90  # player's min rotation angle
+        self.rot_max = 20  # player's max rotation angle
+        self.flap_acc = -9  # players speed on flapping
+        # Per bird state
+        self.y = np.empty(size, dtype=np.float64)
+        self.vel_y = np.empty(size, dtype=np.float64)
+        self.rot = np.empty(size, dtype=np.float64)
+        self.flapped = np.empty(size, dtype=bool)
+        self.alive = np.empty(size, dtype=bool)
+        self.score = np.empty(size, dtype=np.int64)
+        self.survived = np.empty(size, dtype=np.int64)
+        self.gap_distance = np.empty(size, dtype=np.float64)
+        self.reset()
+
+    def reset(self) -> None:
+        """puts every bird back at the start position, alive and in NORMAL mode"""
+        self.y.fill(self.start_y)
+        self.vel_y.fill(-9)
+        self.rot.fill(80)
+        self.flapped.fill(False)
+        self.alive.fill(True)
+        self.score.fill(0)
+        self.survived.fill(0)
+        self.gap_distance.fill(np.nan)
+        self.img_idx = 0
+        self.img_gen = cycle([0, 1, 2, 1])
+        self.frame = 0
+        self.image = self.config.images.player[self.img_idx]
+        self.config.sounds.wing.play()
+
+    @property
+    def num_alive(self) -> int:
+        return int(np.count_nonzero(self.alive))
+
+    def rect_y(self) -> np.ndarray:
+        """top of every bird's rect, truncated like pygame.Rect does"""
+        return np.trunc(self.y).astype(np.int64)
+
+    def flap(self, mask: np.ndarray) -> None:
+        """makes the birds selected by mask flap"""
+        mask = mask & self.alive & (self.y > self.min_y)
+        if not mask.any():
+            return
+        self.vel_y[mask] = self.flap_acc
+        self.flapped[mask] = True
+        self.rot[mask] = 80
+        self.config.sounds.wing.play()
+
+    def crossed(self, pipes: Pipes) -> int:
+        """number of pipes the column of birds crossed on this frame"""
+        cx = self.x + self.w / 2
+        return sum(pipe.cx <= cx < pipe.cx - pipe.vel_x for pipe in pipes.upper)
+
+    def collided(self, pipes: Pipes, floor: Floor) -> np.ndarray:
+        """returns a mask of the alive birds colliding with floor or pipes.
+
+        Rects are tested for the whole population at once, the pixel perfect
+        test only runs for the few birds whose rect overlaps an obstacle.
+        """
+        top = self.rect_y()
+        bottom = top + self.h
+        collided = np.zeros(self.size, dtype=bool)
+        for obstacle in (floor, *pipes.upper, *pipes.lower):
+            rect = obstacle.rect
+            if rect.right <= self.x or rect.left >= self.x + self.w:
+                continue
+            overlap = (
+                self.alive
+                & ~collided
+                & (top < rect.bottom)
+                & (bottom > rect.top)
+            )
+            # rects already overlap, only the masks are left to test
+            for idx in np.flatnonzero(overlap):
+                offset = (rect.x - self.x, rect.y - int(top[idx]))
+                collided[idx] = (
+                    self.hit_mask.overlap(obstacle.hit_mask, offset) is not None
+                )
+        return collided
+
+    def crash(self, mask: np.ndarray, gap_y: Optional[float] = None) -> None:
+        """kills the birds of mask, gap_y is the center of the gap they were crossing or heading to"""
+        if mask.any():
+            self.alive[mask] = False
+            if gap_y is not None:
+                center = self.y[mask] + self.h / 2
+                self.gap_distance[mask] = np.abs(center - gap_y)
+            self.config.sounds.hit.play()
+
+    def update_image(self) -> None:
+        self.frame += 1
+        if self.frame % 5 == 0:
+            self.img_idx = next(self.img_gen)
+            self.image = self.config.images.player[self.img_idx]
+            self.w = self.image.get_width()
+            self.h = self.image.get_height()
+
+    def update(self) -> None:
+        self.update_image()
+        alive = self.alive
+        falling = alive & (self.vel_y < self.max_vel_y) & ~self.flapped
+        self.vel_y[falling] += self.acc_y
+        self.flapped[alive] = False
+        self.survived[alive] += 1
+        self.y[alive] = np.clip(
+            self.y[alive] + self.vel_y[alive], self.min_y, self.max_y
+        )
+        self.rot[alive] = np.clip(
+            self.rot[alive] + self.vel_rot, self.rot_min, self.rot_max
+        )
+
+    def render(self) -> None:
+        # no debug overlay, the entity coordinates are arrays
+        self.draw()
+
+    def draw(self) -> None:
+        rotated_player = self.config.images.rotated_player
+        for y, rot in zip(self.y[self.alive], self.rot[self.alive]):
+            rect = pygame.Rect(self.x, y, self.w, self.h)
+            rotated_image = rotated_player(self.img_idx, rot)
+            rotated_rect = rotated_image.get_rect(center=rect.center)
+            self.config.renderer.blit(rotated_image, rotated_rect)
@@ -1,6 +1,7 @@
 import random
-import time
-from typing import List
+from typing import List, Optional, Sequence
+
+import numpy as np
 
 from ..utils import GameConfig
 from .entity import Entity
@@ -15,16 +16,43 @@ class Pipe(Entity):
     def set_vel_x(self, vel_x):
         self.vel_x = max(self.max_speed, vel_x)
 
-    def draw(self) -> None:
+    def update(self) -> None:
         self.x += self.vel_x
-        super().draw()
+
+
+class PipeSequence:
+    """Replayable sequence of pipe gap heights.
+
+    The i-th gap only depends on the seed (or on the recorded gaps it was built
+    from), so every Pipes playing the same sequence spawns exactly the same
+    level, whatever else consumes random numbers in the process.
+    """
+
+    def __init__(
+        self,
+        low: int,
+        high: int,
+        seed: Optional[int] = None,
+        gaps: Optional[Sequence[int]] = None,
+    ) -> None:
+        self.low = low
+        self.high = high
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.gaps = list(gaps) if gaps is not None else []
+
+    def __getitem__(self, index: int) -> int:
+        # gaps are drawn lazily and kept, so the sequence can be replayed or exported
+        while index >= len(self.gaps):
+            self.gaps.append(self.random.randrange(self.low, self.high))
+        return self.gaps[index]
 
 
 class Pipes(Entity):
     upper: List[Pipe]
     lower: List[Pipe]
 
-    def __init__(self, config: GameConfig, acceleration: bool=False) -> None:
+    def __init__(self, config: GameConfig, acceleration: bool=False, seed: Optional[int]=None, sequence: Optional[PipeSequence]=None) -> None:
         super().__init__(config)
         # Constants
         self.pipe_gap = 120
@@ -34,12 +62,35 @@ class Pipes(Entity):
         self.spawn_acceleration = -60 if acceleration else 0
         self.top = 0
         self.bottom = self.config.window.viewport_height
+        self.frame_ms = 1000 / self.config.fps
+        self.reset(seed, sequence)
+
+    def reset(self, seed: Optional[int]=None, sequence: Optional[PipeSequence]=None) -> None:
+        # Gap heights come from their own sequence, so the same seed always produces the same pipes
+        if sequence is None:
+            base_y = self.config.window.viewport_height
+            sequence = PipeSequence(
+                int(base_y * 0.2),
+                int(base_y * 0.2) + int(base_y * 0.6 - self.pipe_gap),
+                seed=seed,
+            )
+        self.sequence = sequence
+        self.spawned = 0
         # Variables
         self.pipe_vel_x = -5
         self._set_spawn_time(1500)
-        self.last_spawn = -1
+        # Spawning is timed in simulation frames (not wall-clock), so the level is the same at any frame rate
+        self.frame = 0
+        self.last_spawn = None
         self.upper = []
         self.lower = []
+        self._invalidate_next()
+
+    def _invalidate_next(self) -> None:
+        # the next pipe and its features are looked up once per frame (every bird has the same x)
+        self._next_x = None
+        self._next_index = None
+        self._features = None
     
     def _set_pipe_vel_x(self, vel_x):
         self.pipe_vel_x = max(self.max_vel_x, vel_x) # max because speed is negative
@@ -52,23 +103,66 @@ class Pipes(Entity):
         self._set_spawn_time(self.spawn_time+self.spawn_acceleration)
         
 
-    def tick(self) -> None:
+    def update(self) -> None:
+        self.frame += 1
         if self.can_spawn_pipes():
-            self.last_spawn = time.time()*1000
+            self.last_spawn = self.frame
             self.spawn_new_pipes()
         self.remove_old_pipes()
 
         for up_pipe, low_pipe in zip(self.upper, self.lower):
-            up_pipe.tick()
-            low_pipe.tick()
+            up_pipe.update()
+            low_pipe.update()
+        self._invalidate_next()
+
+    def next_pipe(self, x: float) -> Optional[int]:
+        """index of the first pipe whose center is ahead of x, None if there is none"""
+        if x != self._next_x:
+            self._next_x = x
+            self._next_index = next(
+                (i for i, pipe in enumerate(self.lower) if pipe.x + pipe.w / 2 > x),
+                None,
+            )
+            self._features = None
+        return self._next_index
+
+    def gap_y(self, x: float) -> Optional[float]:
+        """center of the gap a bird at x is crossing or heading to, None if there is none"""
+        # unlike next_pipe, a pipe counts until its right edge is behind x, so a
+        # bird crashing into the back half of a pipe is measured against its gap
+        for pipe in self.lower:
+            if pipe.x + pipe.w > x:
+                return pipe.y - self.pipe_gap / 2
+        return None
+
+    def features(self, x: float) -> np.ndarray:
+        """network inputs that only depend on the pipes, shared by every bird at x"""
+        index = self.next_pipe(x)
+        if self._features is None:
+            if index is None:
+                # no pipe ahead yet: a pipe far away at the bottom right
+                window = self.config.window
+                values = (window.viewport_width, window.viewport_height, window.viewport_width, 0)
+            else:
+                lower, upper = self.lower[index], self.upper[index]
+                values = (lower.x, lower.y, upper.x, upper.y)
+            self._features = np.array(values, dtype=np.float32)
+        return self._features
+
+    def render(self) -> None:
+        for up_pipe, low_pipe in zip(self.upper, self.lower):
+            up_pipe.render()
+            low_pipe.render()
 
     def stop(self) -> None:
         for pipe in self.upper + self.lower:
             pipe.vel_x = 0
 
     def can_spawn_pipes(self) -> bool:
-        now_ms = time.time() * 1000
-        return now_ms - self.last_spawn > self.spawn_time
+        if self.last_spawn is None:
+            return True
+        elapsed_ms = (self.frame - self.last_spawn) * self.frame_ms
+        return elapsed_ms > self.spawn_time
 
     def spawn_new_pipes(self):
         # add new pipe when first pipe is about to touch left of screen
@@ -91,10 +185,8 @@ class Pipes(Entity):
     def make_random_pipes(self):
         """returns a randomly generated pipe"""
         # y of gap between upper and lower pipe
-        base_y = self.config.window.viewport_height
-
-        gap_y = random.randrange(0, int(base_y * 0.6 - self.pipe_gap))
-        gap_y += int(base_y * 0.2)
+        gap_y = self.sequence[self.spawned]
+        self.spawned += 1
         pipe_height = self.config.images.pipe[0].get_height()
         pipe_x = self.config.window.width + 10
 
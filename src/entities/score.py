@@ -34,5 +34,5 @@ class Score(Entity):
         x_offset = (self.config.window.width - digits_width) / 2
 
         for image in images:
-            self.config.screen.blit(image, (x_offset, self.y))
+            self.config.renderer.blit(image, (x_offset, self.y))
             x_offset += image.get_width()
@@ -0,0 +1,180 @@
+from typing import TYPE_CHECKING, Optional, Union
+
+import numpy as np
+
+from .entities import Background, Floor, Flock, Pipes, Score
+from .utils import GameConfig, NullProfiler, Profiler
+
+if TYPE_CHECKING:
+    # torch is only imported by the torch backend
+    from .ai.model import FFPopulation
+    from .ai.numpy_model import NumpyPopulation
+
+
+class Episode:
+    """A single game played by a whole population at the same time.
+
+    Holds the world entities and advances them one frame per step, with no
+    event handling or display updates, so the same episode can be run by the
+    training window, a headless trainer or a worker process.
+
+    The episode ends when every bird is dead, or earlier once max_frames frames
+    were played, a score of max_score was reached or at most top_k birds are
+    still alive (the best top_k are known by then). The birds still alive keep
+    the score they had when it stopped.
+
+    The fitness of every bird is frame_reward per frame survived (counted by
+    the flock) plus the rewards accumulated while it plays: pipe_reward per
+    pipe crossed and, when it dies, up to
+    gap_reward the closer it was to the center of the gap it was heading to.
+    The birds still alive when the episode stops are credited with the whole
+    gap_reward by finish(), so they always rank above the birds already dead.
+
+    With record_progress, the score and fitness of the birds still alive are
+    recorded after every step (see reset_progress), for a ParallelEvaluator
+    that applies top_k to the merged results of its shards.
+    """
+
+    def __init__(
+        self,
+        config: GameConfig,
+        brains: Union["FFPopulation", "NumpyPopulation"],
+        acceleration: bool = False,
+        seed: Optional[int] = None,
+        profiler: Optional[Profiler] = None,
+        max_frames: float = float("inf"),
+        max_score: float = float("inf"),
+        top_k: int = 0,
+        frame_reward: float = 0.1,
+        pipe_reward: float = 100.0,
+        gap_reward: float = 100.0,
+        record_progress: bool = False,
+    ) -> None:
+        self.config = config
+        self.brains = brains
+        self.max_frames = max_frames
+        self.max_score = max_score
+        self.top_k = top_k
+        self.frame_reward = frame_reward
+        self.pipe_reward = pipe_reward
+        self.gap_reward = gap_reward
+        self.record_progress = record_progress
+        self.profiler = profiler or NullProfiler()
+        self.score = Score(config)
+        self.background = Background(config)
+        self.floor = Floor(config)
+        self.pipes = Pipes(config, acceleration=acceleration, seed=seed)
+        self.flock = Flock(config, len(brains))
+        # update and drawing order
+        self.entities = (
+            self.background,
+            self.floor,
+            self.pipes,
+            self.score,
+            self.flock,
+        )
+        # pipe and gap rewards, the frame reward is added by the fitness property
+        self.rewards = np.zeros(len(brains), dtype=np.float64)
+        self.frame = 0
+        self.finished = False
+        self.reset_progress()
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """starts a new game reusing every entity, array and network buffer"""
+        self.score.reset()
+        self.floor.reset()
+        self.pipes.reset(seed)
+        self.flock.reset()
+        self.rewards.fill(0)
+        self.frame = 0
+        self.finished = False
+        self.reset_progress()
+
+    def reset_progress(self) -> None:
+        # progress[s]: score and fitness (once finished) of any bird still alive after s steps, they are the same for all.
+        # Lets the population be split between processes (all playing the full episode) and top_k applied afterwards
+        self._alive_score = 0
+        self._alive_rewards = 0.0
+        self.progress = (
+            [(0, float(self.gap_reward))] if self.record_progress else None
+        )
+
+    @property
+    def done(self) -> bool:
+        return (
+            self.flock.num_alive <= self.top_k
+            or self.frame >= self.max_frames
+            or self.score.score >= self.max_score
+        )
+
+    @property
+    def fitness(self) -> np.ndarray:
+        """fitness of every bird so far"""
+        return self.frame_reward * self.flock.survived + self.rewards
+
+    def step(self) -> int:
+        """advances the game one frame, returns the number of pipes crossed"""
+        flock = self.flock
+        profiler = self.profiler
+        rewards = self.rewards
+        with profiler.phase("collision"):
+            # alive holds the birds playing this frame, even if they crash on it
+            alive = flock.alive.copy()
+            crashed = flock.collided(self.pipes, self.floor)
+            if crashed.any():
+                gap_y = self.pipes.gap_y(flock.x)
+                flock.crash(crashed, gap_y)
+                if gap_y is not None:
+                    viewport = self.config.window.viewport_height
+                    alignment = 1 - flock.gap_distance[crashed] / viewport
+                    rewards[crashed] += self.gap_reward * alignment.clip(min=0)
+            crossed = flock.crossed(self.pipes)
+            if crossed:
+                flock.score[alive] += crossed
+                rewards[alive] += self.pipe_reward * crossed
+                self.score.add()
+                self._alive_score += crossed
+                self._alive_rewards += self.pipe_reward * crossed
+
+        with profiler.phase("inference"):
+            # Every bird still alive executes a single action (jump or not), all networks run in one batch.
+            # The pipe features are computed once and broadcast, only the height differs between birds
+            nn_input = np.empty((flock.num_alive, 5), dtype=np.float32)
+            nn_input[:, 0] = flock.y[flock.alive]
+            nn_input[:, 1:] = self.pipes.features(flock.x)
+            jump = self.brains.jump_mask(nn_input, flock.alive)
+
+        with profiler.phase("physics"):
+            flock.flap(jump)
+            for entity in self.entities:
+                entity.update()
+
+        if not self.config.headless:
+            with profiler.phase("rendering"):
+                for entity in self.entities:
+                    entity.render()
+        self.frame += 1
+        if self.progress is not None:
+            # same operations as finish() and the fitness property, so the values are identical
+            self.progress.append(
+                (
+                    self._alive_score,
+                    self.frame_reward * self.frame
+                    + (self._alive_rewards + self.gap_reward),
+                )
+            )
+        profiler.end_frame()
+        return crossed
+
+    def finish(self) -> np.ndarray:
+        """once done: credits the birds still alive with the gap reward, returns the fitness of each bird"""
+        if not self.finished:
+            self.finished = True
+            self.rewards[self.flock.alive] += self.gap_reward
+        return self.fitness
+
+    def run(self) -> np.ndarray:
+        """plays until the episode is done, returns the fitness of each bird"""
+        while not self.done:
+            self.step()
+        return self.finish()
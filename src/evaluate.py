@@ -0,0 +1,146 @@
+"""Best model evaluation.
+
+Plays the individual saved in best.pth (or best.npz) on a few seeded levels and
+reports the score and fitness of each one.
+
+    python main.py evaluate --episodes 10 --seed 0
+
+Episodes are headless (as fast as possible) unless --watch is given, and end
+after --max-frames frames if the bird is still alive. The network topology,
+backend and fitness rewards are read from src/ai/config.yaml, as when training.
+"""
+import argparse
+import asyncio
+import random
+import sys
+from typing import Any, Dict, List, Optional
+
+import pygame
+import yaml
+from pygame.locals import K_ESCAPE, KEYDOWN, QUIT
+
+from .ai import AI_CONFIG_PATH, BEST_MODEL_PATH, backend
+from .episode import Episode
+from .ff_player import FFPlayer
+from .utils import GameConfig, Images, Sounds, Window
+
+
+def create_config(watch: bool, seed: Optional[int] = None) -> GameConfig:
+    if not watch:
+        return GameConfig.create_headless(fps=30, seed=seed)
+    pygame.init()
+    pygame.display.set_caption("Flappy Bird")
+    window = Window(288, 512)
+    screen = pygame.display.set_mode((window.width, window.height))
+    return GameConfig(
+        screen=screen,
+        clock=pygame.time.Clock(),
+        fps=30,
+        window=window,
+        images=Images(random.Random(seed)),
+        sounds=Sounds(),
+    )
+
+
+async def play(episode: Episode, seed: int, watch: bool) -> None:
+    episode.reset(seed)
+    if watch:
+        episode.config.renderer.invalidate()
+    while not episode.done:
+        episode.step()
+        if watch:
+            for event in pygame.event.get():
+                if event.type == QUIT or (
+                    event.type == KEYDOWN and event.key == K_ESCAPE
+                ):
+                    pygame.quit()
+                    sys.exit()
+            episode.config.renderer.present()
+            await asyncio.sleep(0)
+            episode.config.tick()
+    episode.finish()
+
+
+async def evaluate(
+    episodes: int, seed: int, max_frames: float, watch: bool = False
+) -> List[Dict[str, Any]]:
+    """plays the best model on `episodes` levels, seeded from seed on"""
+    with AI_CONFIG_PATH.open("r") as f:
+        ga_configs = yaml.safe_load(f)
+    network = ga_configs.get("network", {}) or {}
+    network = {
+        "hidden_layers": network.get("hidden_layers", [6, 3]),
+        "activations": network.get("activations", None),
+        "backend": network.get("backend", "numpy"),
+    }
+    fitness = ga_configs.get("fitness", {}) or {}
+
+    config = create_config(watch, seed)
+    player = FFPlayer(config, **network)
+    player.load_best()
+    brains = backend.create_population(
+        player.export_chromosome()[None].copy(), **network
+    )
+    episode = Episode(
+        config,
+        brains,
+        acceleration=ga_configs.get("enable_acceleration", False),
+        max_frames=max_frames,
+        frame_reward=fitness.get("frame", 0.1),
+        pipe_reward=fitness.get("pipe", 100.0),
+        gap_reward=fitness.get("gap", 100.0),
+    )
+
+    results = []
+    for level in range(seed, seed + episodes):
+        await play(episode, level, watch)
+        result = {
+            "seed": level,
+            "score": int(episode.flock.score[0]),
+            "fitness": float(episode.fitness[0]),
+            "frames": episode.frame,
+        }
+        print(
+            f"level seed {level}: score {result['score']}"
+            f" / fitness {result['fitness']:.1f} / {result['frames']} frames"
+        )
+        results.append(result)
+    return results
+
+
+def main(argv=None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--episodes", type=int, default=10)
+    parser.add_argument(
+        "--seed", type=int, default=0, help="seed of the first level"
+    )
+    parser.add_argument(
+        "--max-frames",
+        type=int,
+        default=10000,
+        help="frame cap of each episode, so a good model does not play forever",
+    )
+    parser.add_argument(
+        "--watch", action="store_true", help="show the episodes"
+    )
+    args = parser.parse_args(argv)
+
+    # best.npz is the version saved by the numpy backend
+    if (
+        not BEST_MODEL_PATH.exists()
+        and not BEST_MODEL_PATH.with_suffix(".npz").exists()
+    ):
+        sys.exit(f"No model to evaluate, {BEST_MODEL_PATH} does not exist")
+    results = asyncio.run(
+        evaluate(args.episodes, args.seed, args.max_frames, args.watch)
+    )
+    scores = [result["score"] for result in results]
+    print(
+        f"{len(scores)} episodes: mean score {sum(scores) / len(scores):.2f}"
+        f" / min {min(scores)} / max {max(scores)}"
+    )
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .ai import backend
+from .episode import Episode
+from .utils import GameConfig
+
+_worker_config: Optional[GameConfig] = None
+# Episodes are reused between generations, keyed by shard size, with the chromosomes buffer their networks are views of
+_worker_episodes: Dict[int, Tuple[Episode, np.ndarray]] = {}
+
+
+def _init_worker(network_backend: str) -> None:
+    global _worker_config
+    # Each worker already runs on its own core, extra torch threads only compete with the other workers
+    backend.set_num_threads(1, network_backend)
+    _worker_config = GameConfig.create_headless()
+
+
+def _evaluate_shard(
+    chromosomes: np.ndarray,
+    seed: int,
+    acceleration: bool,
+    network: dict,
+    options: dict,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[list]]:
+    if len(chromosomes) not in _worker_episodes:
+        buffer = chromosomes.copy()
+        brains = backend.create_population(buffer, **network)
+        episode = Episode(
+            _worker_config, brains, acceleration=acceleration, **options
+        )
+        _worker_episodes[len(chromosomes)] = (episode, buffer)
+    else:
+        episode, buffer = _worker_episodes[len(chromosomes)]
+        buffer[:] = chromosomes
+    episode.reset(seed)
+    fitness = episode.run()
+    return (
+        fitness,
+        episode.flock.score,
+        episode.flock.survived,
+        episode.progress,
+    )
+
+
+def apply_top_k(
+    fitness: np.ndarray,
+    scores: np.ndarray,
+    survived: np.ndarray,
+    progress: List[Tuple[int, float]],
+    top_k: int,
+) -> None:
+    """stops, in place, fully played results where a single episode with top_k would have stopped"""
+    if top_k <= 0:
+        return
+    # After s steps the birds alive are the ones that survived at least s frames, the
+    # episode stops after the first step leaving at most top_k of them
+    if len(survived) <= top_k:
+        stop = 0
+    else:
+        stop = int(np.partition(survived, -(top_k + 1))[-(top_k + 1)]) + 1
+    kept = survived >= stop
+    if kept.any():
+        scores[kept], fitness[kept] = progress[stop]
+
+
+class ParallelEvaluator:
+    """Plays a generation split across a pool of headless worker processes.
+
+    Only chromosomes (a numpy matrix, one row per individual) are sent to the
+    workers, and every shard plays the same seeded pipe sequence, so the scores
+    and fitness are the same as playing the whole population in a single
+    episode. The top_k episode limit needs the whole population, so the
+    shards are played without it and it is applied to the merged results.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        acceleration: bool = False,
+        network: Optional[dict] = None,
+        episode_options: Optional[dict] = None,
+    ) -> None:
+        self.workers = workers
+        self.acceleration = acceleration
+        self.network = network or {}
+        # Episode keyword arguments: limits and fitness rewards
+        self.top_k = (episode_options or {}).get("top_k", 0)
+        # the shards only record their progress when top_k needs it
+        self.episode_options = {
+            **(episode_options or {}),
+            "top_k": 0,
+            "record_progress": self.top_k > 0,
+        }
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.network.get("backend", "numpy"),),
+        )
+
+    def evaluate(
+        self, chromosomes: np.ndarray, seed: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """returns the fitness and the score of every row of chromosomes"""
+        shards = [
+            shard
+            for shard in np.array_split(chromosomes, self.workers)
+            if len(shard)
+        ]
+        futures = [
+            self.pool.submit(
+                _evaluate_shard,
+                shard,
+                seed,
+                self.acceleration,
+                self.network,
+                self.episode_options,
+            )
+            for shard in shards
+        ]
+        results = [future.result() for future in futures]
+        fitness = np.concatenate([result[0] for result in results])
+        scores = np.concatenate([result[1] for result in results])
+        if self.top_k > 0:
+            survived = np.concatenate([result[2] for result in results])
+            # every shard plays the same level, the longest one knows the progress of all the others
+            progress = max((result[3] for result in results), key=len)
+            apply_top_k(fitness, scores, survived, progress, self.top_k)
+        return fitness, scores
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,47 @@
+import numpy as np
+
+from typing import Optional
+
+from .ai import BEST_MODEL_PATH, backend
+from .player import Player, PlayerAction
+from .utils import GameConfig
+
+# The AI player lives apart from the human one, so playing the game never imports the AI
+
+
+class FFPlayer(Player):
+    ### Feed Forward Neural Network Player
+    def __init__(self, config:GameConfig, chromosome:Optional[np.ndarray]=None, **network):
+        # network: hidden_layers, activations and backend (numpy or torch)
+        super().__init__(config)
+        self.player_state = PlayerAction.NOTHING
+        self.backend = network.get('backend', 'numpy')
+        self.nn = backend.create_network(chromosome, **network)
+
+    def process_event(self, event) -> None:
+        # AI won't use any keyboard events to play, so we just return
+        return
+    
+    def export_chromosome(self) -> np.ndarray:
+        return np.asarray(self.nn.to_chromosome())
+
+    def load_chromosome(self, chromosome:np.ndarray) -> None:
+        self.nn.load_chromosome(chromosome)
+
+    def save(self) -> None:
+        # best.pth with the torch backend, best.npz with the numpy one (both backends load the most recent)
+        backend.save_chromosome(self.export_chromosome(), self.nn.layout, BEST_MODEL_PATH, self.backend)
+
+    def load_best(self) -> bool:
+        chromosome = backend.load_chromosome(self.nn.layout, BEST_MODEL_PATH)
+        if chromosome is not None:
+            self.nn.load_chromosome(chromosome)
+        elif self.config.headless:
+            print('No previous model was found, starting training from scratch')
+            return False
+        else:
+            from tkinter import messagebox, Tk
+            Tk().wm_withdraw() #to hide the main window
+            messagebox.showinfo('Warning', 'No previous model was found, starting training from scratch')
+            return False
+        return True
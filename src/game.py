@@ -1,6 +1,7 @@
 import asyncio
 from enum import Enum, auto
 import sys
+from typing import Optional
 
 import pygame
 from pygame.locals import K_ESCAPE, KEYDOWN, QUIT
@@ -14,8 +15,8 @@ from .entities import (
     Score,
     WelcomeMessage,
 )
-from .utils import GameConfig, Images, Sounds, Window
-from .player import FFPlayer, HumanPlayer, PlayerState
+from .utils import GameConfig, Images, NullProfiler, Profiler, Sounds, Window
+from .player import HumanPlayer, PlayerState
 
 
 class Game:
@@ -23,7 +24,7 @@ class Game:
         PLAY = auto()
         TRAIN = auto()
 
-    def __init__(self, game_mode:GameMode):
+    def __init__(self, game_mode:GameMode, profiler:Optional[Profiler]=None):
         pygame.init()
         pygame.display.set_caption("Flappy Bird")
         window = Window(288, 512)
@@ -31,6 +32,8 @@ class Game:
         images = Images()
 
         self.game_mode = game_mode
+        # Opt-in timing of the phases of play(), a round counts as a generation
+        self.profiler = profiler or NullProfiler()
         self.config = GameConfig(
             screen=screen,
             clock=pygame.time.Clock(),
@@ -41,6 +44,7 @@ class Game:
         )
 
     async def start(self):
+        self.players = [HumanPlayer(self.config)]
         while True:
             self.score = Score(self.config)
             self.background = Background(self.config)
@@ -48,9 +52,13 @@ class Game:
             self.welcome_message = WelcomeMessage(self.config)
             self.game_over_message = GameOver(self.config)
             self.pipes = Pipes(self.config)
-            self.players = [HumanPlayer(self.config)]
+            self.config.renderer.invalidate()
+            for player in self.players:
+                player.reset()
             await self.splash()
             await self.play()
+            if self.profiler.enabled:
+                print(self.profiler.format_summary(self.profiler.end_generation()))
             await self.game_over()
 
     async def splash(self):
@@ -68,7 +76,7 @@ class Game:
             #self.player.tick()
             self.welcome_message.tick()
 
-            pygame.display.update()
+            self.config.renderer.present()
             await asyncio.sleep(0)
             self.config.tick()
 
@@ -76,6 +84,8 @@ class Game:
         if event.type == QUIT or (
             event.type == KEYDOWN and event.key == K_ESCAPE
         ):
+            if self.profiler.enabled:
+                print(self.profiler.close())
             pygame.quit()
             sys.exit()
 
@@ -83,32 +93,36 @@ class Game:
         for player in self.players:
             player.flappy.set_mode(FlappyMode.NORMAL)
 
+        profiler = self.profiler
         while True:
             current_events = []
             scored = False
             death_count = 0
 
-            for event in pygame.event.get():
-                self.check_quit_event(event)
-                current_events.append(event)
+            with profiler.phase("events"):
+                for event in pygame.event.get():
+                    self.check_quit_event(event)
+                    current_events.append(event)
 
             for player in self.players:
                 if player.state is PlayerState.DEAD:
                     death_count += 1
                     continue
-                if player.check_colision(self.pipes, self.floor):
-                    player.crash()
-                for _, pipe in enumerate(self.pipes.upper):
-                    # Check if crossed pipe or if other player already scored (this avoid the checking multiple times since all players have the same X coordinate)
-                    if scored or player.check_crossed_pipe(pipe):
-                        player.scored() # just set scored to True, its not cummulative
-                        scored = True
-
-                for event in current_events:
-                    player.process_event(event)
-
-                # Allow player to execute a single action (jump or not) depending on the events he processed
-                player.make_a_play(self.pipes)
+                with profiler.phase("collision"):
+                    if player.check_colision(self.pipes, self.floor):
+                        player.crash()
+                    for _, pipe in enumerate(self.pipes.upper):
+                        # Check if crossed pipe or if other player already scored (this avoid the checking multiple times since all players have the same X coordinate)
+                        if scored or player.check_crossed_pipe(pipe):
+                            player.scored() # just set scored to True, its not cummulative
+                            scored = True
+
+                with profiler.phase("inference"):
+                    for event in current_events:
+                        player.process_event(event)
+
+                    # Allow player to execute a single action (jump or not) depending on the events he processed
+                    player.make_a_play(self.pipes)
                 
             if scored:
                 self.score.add()
@@ -118,17 +132,26 @@ class Game:
                 return
             else:
                 death_count = 0
-    
-            self.background.tick()
-            self.floor.tick()
-            self.pipes.tick()
-            self.score.tick()
-            for player in self.players:
-                player.tick()
 
-            pygame.display.update()
-            await asyncio.sleep(0)
-            self.config.tick()
+            self.tick_entities()
+
+            with profiler.phase("display"):
+                self.config.renderer.present()
+            # Waiting for the fps cap
+            with profiler.phase("frame_wait"):
+                await asyncio.sleep(0)
+                self.config.tick()
+            profiler.end_frame()
+
+    def tick_entities(self):
+        """Same as ticking every entity, with the simulation and the drawing timed apart"""
+        entities = [self.background, self.floor, self.pipes, self.score] + [player.flappy for player in self.players]
+        with self.profiler.phase("physics"):
+            for entity in entities:
+                entity.update()
+        with self.profiler.phase("rendering"):
+            for entity in entities:
+                entity.render()
 
     async def train(self):
         return
@@ -155,7 +178,7 @@ class Game:
             self.game_over_message.tick()
 
             self.config.tick()
-            pygame.display.update()
+            self.config.renderer.present()
             await asyncio.sleep(0)
 
     def is_tap_event(self, event):
@@ -1,135 +1,208 @@
 import asyncio
+import random
 import sys
 import time
 import yaml
+from pathlib import Path
+from typing import Optional
 
 import numpy as np
-import torch
 import pygame
 from pygame.locals import K_ESCAPE, KEYDOWN, QUIT
 
-from .entities import (
-    Background,
-    Floor,
-    Pipes,
-    FlappyMode,
-    Score,
-)
-from .ai import AI_CONFIG_PATH
-from .ai.plotter import NetworkPlotter
-from .utils import GameConfig, Images, Sounds, Window
-from .player import FFPlayer, PlayerState
+from .ai import AI_CONFIG_PATH, CHECKPOINT_DIR
+from .ai import backend, checkpoint, genetic
+from .episode import Episode
+from .evaluator import ParallelEvaluator
+from .utils import GameConfig, Images, NullProfiler, Profiler, Sounds, Window
+from .ff_player import FFPlayer
 
 
 class TrainGA:
-    def __init__(self):
-        # Game configs
-        pygame.init()
-        pygame.display.set_caption("Flappy Bird")
-        window = Window(288, 512)
-        screen = pygame.display.set_mode((window.width, window.height))
-        images = Images()
-        self.config = GameConfig(
-            screen=screen,
-            clock=pygame.time.Clock(),
-            fps=30,
-            window=window,
-            images=images,
-            sounds=Sounds()
-        )
-        # GA configs
+    def __init__(self, overrides:Optional[dict]=None):
+        # GA configs, overrides (e.g. from the command line) replace the values of config.yaml (one level deep for sections)
         with AI_CONFIG_PATH.open('r') as f:
             self.ga_configs = yaml.safe_load(f)
-        self.nn_plotter = NetworkPlotter()
+        for key, value in (overrides or {}).items():
+            if isinstance(value, dict) and isinstance(self.ga_configs.get(key), dict):
+                value = {**self.ga_configs[key], **value}
+            self.ga_configs[key] = value
+        self.headless = self.ga_configs.get('headless', False)
+        # Network topology and inference backend, the genome length and crossover point are derived from the topology
+        network = self.ga_configs.get('network', {})
+        self.network = {
+            'hidden_layers': network.get('hidden_layers', [6, 3]),
+            'activations': network.get('activations', None),
+            'backend': network.get('backend', 'numpy')
+        }
+        # Reproducibility: a single seed drives the GA random numbers, the levels of every generation and the sprites
+        seed = self.ga_configs.get('seed', None)
+        self.rng = random.Random(seed)
+        if seed is not None:
+            backend.manual_seed(seed, self.network['backend'])
+        # Game configs
+        if self.headless:
+            self.config = GameConfig.create_headless(fps=30, seed=seed)
+        else:
+            pygame.init()
+            pygame.display.set_caption("Flappy Bird")
+            window = Window(288, 512)
+            screen = pygame.display.set_mode((window.width, window.height))
+            images = Images(random.Random(seed))
+            self.config = GameConfig(
+                screen=screen,
+                clock=pygame.time.Clock(),
+                fps=30,
+                window=window,
+                images=images,
+                sounds=Sounds()
+            )
+        # The visualizer runs in its own process, rate limited to plotter.fps updates per second (or disabled)
+        plotter_configs = self.ga_configs.get('plotter', {}) or {}
+        self.nn_plotter = None
+        if not self.headless and plotter_configs.get('enabled', True):
+            # matplotlib is only imported when the visualizer is used
+            from .ai.plotter import NetworkPlotter
+            reference = backend.create_network(**self.network)
+            self.nn_plotter = NetworkPlotter(reference.sizes, reference.layout, fps=plotter_configs.get('fps', 10))
+        # Per generation limits, so a generation can't play forever once a good individual appears
+        episode_limits = self.ga_configs.get('episode_limits', {}) or {}
+        self.episode_limits = {
+            'max_frames': episode_limits.get('frames', float('inf')),
+            'max_score': episode_limits.get('score', float('inf')),
+            'top_k': episode_limits.get('top_k', 0)
+        }
+        # Fitness used for the selection, finer than the score so early generations (all at score 0) can still improve
+        fitness = self.ga_configs.get('fitness', {}) or {}
+        self.episode_options = {
+            **self.episode_limits,
+            'frame_reward': fitness.get('frame', 0.1),
+            'pipe_reward': fitness.get('pipe', 100.0),
+            'gap_reward': fitness.get('gap', 100.0)
+        }
+        # Parallel evaluation only makes sense when nothing has to be drawn
+        workers = self.ga_configs.get('workers', 1)
+        self.evaluator = None
+        if self.headless and workers > 1:
+            self.evaluator = ParallelEvaluator(workers, acceleration=self.ga_configs.get('enable_acceleration', False), network=self.network, episode_options=self.episode_options)
+        # Opt-in timing of every phase of the loop, summarized after each generation
+        profiling = self.ga_configs.get('profiling', {}) or {}
+        self.profiler = Profiler(profiling.get('trace_file', None)) if profiling.get('enabled', False) else NullProfiler()
         self.generation = 0
         self.population_size = self.ga_configs.get('population_size', 200)
-        self.population = [FFPlayer(self.config) for _ in range(self.population_size)]
-        self.best_individual = self.population[0] # Adopts a random individual as the first best for reference (will be updated once the game starts)
-        # If load best is True, load the first individual in the population as a copy of it and all the others as mutated variants
-        if self.ga_configs.get('load_previous_best', True):
-            for i, ind in enumerate(self.population):
-                success = ind.load_best()
-                if not success:
-                    break # just stop loading and keep the randomly initialized networks
-                chromosome = ind.export_chromosome()
-                self.mutate(chromosome)
-                ind.load_chromosome(chromosome)
-                
+        # The population is a (population_size, genome_len) matrix, one chromosome per row.
+        # Offspring are bred into a second buffer and copied back, so the same buffers (and the network views on them) are reused every generation
+        self.population = backend.random_chromosomes(self.population_size, self.network['hidden_layers'], self.network['activations'])
+        self.offspring = np.empty_like(self.population)
+        self.brains = backend.create_population(self.population, **self.network)
+        # Adopts a random individual as the first best for reference (will be updated once the game starts)
+        self.best_chromosome = self.population[0].copy()
+        self.best_score = 0
+        self.best_fitness = 0
+        # Last generation that improved the best fitness (or reset the population), to detect a stuck population
+        self.improved_generation = 0
+        # (generation, best score, best fitness, mean fitness) of every generation played
+        self.history = []
+        # Periodic checkpoints of the whole GA state, to resume long runs
+        checkpoint_configs = self.ga_configs.get('checkpoint', {}) or {}
+        self.checkpoint_every = checkpoint_configs.get('every', 0)
+        self.checkpoint_keep = checkpoint_configs.get('keep', 3)
+        self.checkpoint_dir = Path(checkpoint_configs.get('directory', None) or CHECKPOINT_DIR)
+        self.episode = Episode(self.config, self.brains, acceleration=self.ga_configs.get('enable_acceleration', False), profiler=self.profiler, **self.episode_options)
+        # Resuming from the latest checkpoint restores everything, otherwise if load best is True, load all individuals as mutated variants of it
+        latest = checkpoint.latest_checkpoint(self.checkpoint_dir) if checkpoint_configs.get('resume', False) else None
+        if latest is not None:
+            self.resume(latest)
+        elif self.ga_configs.get('load_previous_best', True):
+            loader = FFPlayer(self.config, **self.network)
+            if loader.load_best():
+                self.population[:] = loader.export_chromosome()
+                self.mutate(self.population)
 
     async def start(self):
         self.training_start = time.time()
         while True:
             self.generation+=1
-            self.score = Score(self.config)
-            self.background = Background(self.config)
-            self.floor = Floor(self.config)
-            self.pipes = Pipes(self.config, acceleration=self.ga_configs.get('enable_acceleration', False))
+            # Every individual of the generation (in any process) plays the same pipes, replayable from this seed
+            self.seed = self.rng.randrange(2**32)
 
-            print(f"Generation {self.generation} / Best score = {self.best_individual.score} / simulation time ({int(time.time()-self.training_start)} s)")
+            print(f"Generation {self.generation} / Best score = {self.best_score} / simulation time ({int(time.time()-self.training_start)} s) / level seed {self.seed}")
             
-            # Check if all individuals are hardstuck at score 0 for more then the given number of generations
-            hardstuck = self.best_individual.score == 0 and not self.generation%self.ga_configs.get('hardstuck_gen', 10)
+            # Check if all individuals are hardstuck at score 0, without any fitness improvement for the given number of generations
+            hardstuck = self.best_score == 0 and self.generation - self.improved_generation > self.ga_configs.get('hardstuck_gen', 10)
             if hardstuck:
                 print(f'>>> Generation {self.generation} is hardstuck... Reseting population')
-                for ind in self.population[::-1]:
-                    del ind
-                self.population = [FFPlayer(self.config) for _ in range(self.population_size)]
+                self.improved_generation = self.generation - 1
+                self.population[:] = backend.random_chromosomes(self.population_size, self.network['hidden_layers'], self.network['activations'])
 
             # === Score population (fitness function)
-            await self.play()
-            scores = np.array([ind.score for ind in self.population])
-
-            # === Select parents based on fitness
-            # Normalize the scores
-            total = scores.sum()
-            if total == 0:
-                scores_norm = np.zeros(scores.shape)
+            if self.evaluator is not None:
+                fitness, scores = self.evaluate_parallel()
             else:
-                scores_norm = scores/scores.sum()
-            # Generate a accumulated sum of the normalized scores
-            scores_norm = np.cumsum(scores_norm)
-            # Elitism
-            new_population = []
-            if self.ga_configs.get('elitism', True):
-                new_population.append(FFPlayer(self.config, self.best_individual.export_chromosome()))
-            # Randomly (uniform) select the parents
-            while len(new_population) != len(self.population):
-                # Get 2 parents randomly (save the indexes)
-                parents = [self.population[np.argmax(scores_norm > np.random.uniform())] for _ in range(2)]
-                # === Crossover
-                new_chromosome = self.crossover(*parents)
-                # === Mutation
-                self.mutate(new_chromosome)
-                new_population.append(FFPlayer(self.config, chromosome=new_chromosome))
-
-            # === Kill old population
-            for individual in self.population[::-1]:
-                del individual
-            # === Replace the population
-            self.population = new_population
-
-            # === Reset game
-            await self.reset()
-
-    def crossover(self, parent1:FFPlayer, parent2:FFPlayer) -> torch.Tensor:
-        p1_chromosome = parent1.export_chromosome()
-        p2_chromosome = parent2.export_chromosome()
-        
-        # == Random sampling
-        #genes_division = np.random.randint(low=0, high=2, size=len(p1_chromosome)) # High is not inclusive so this is actually a random binary array
-        #son_chromosome = [p1_chromosome[gene].item() if selected_parent%2 else p2_chromosome[gene].item() for gene, selected_parent in enumerate(genes_division)]
-        # == Ordered: Half / Half
-        son_chromosome = [*p1_chromosome[:31], *p2_chromosome[31:]]
-        
-        return torch.Tensor(son_chromosome).type(p1_chromosome.dtype)
-
-    def mutate(self, chromosome:torch.Tensor):
-        random_selection = np.random.uniform(size=len(chromosome))
-        genes_to_mutate = random_selection < self.ga_configs.get('mutation_probability', 0.05)
-        for mutate, gene in zip(genes_to_mutate, range(len(chromosome))):
-            if mutate:
-                # Mutation adds or subtracts a random value from a normal distribution (mean=0, std_dev=user_defined)
-                chromosome[gene] += np.random.normal(0, self.ga_configs.get('mutation_standard_deviation', 0.3))
+                self.episode.reset(self.seed)
+                fitness = await self.play()
+                scores = self.episode.flock.score
+                # === Reset game
+                await self.reset()
+            self.history.append((self.generation, int(scores.max()), float(fitness.max()), float(fitness.mean())))
+
+            # === Selection, crossover and mutation of the whole population at once
+            with self.profiler.phase('breeding'):
+                genetic.next_generation(
+                    self.population,
+                    fitness,
+                    probability=self.ga_configs.get('mutation_probability', 0.05),
+                    std=self.ga_configs.get('mutation_standard_deviation', 0.3),
+                    elite=self.best_chromosome if self.ga_configs.get('elitism', True) else None,
+                    out=self.offspring
+                )
+                self.population[:] = self.offspring
+
+            if self.profiler.enabled:
+                print(self.profiler.format_summary(self.profiler.end_generation()))
+
+            if self.checkpoint_every and not self.generation % self.checkpoint_every:
+                self.save_checkpoint()
+
+    def save_checkpoint(self) -> None:
+        # Saved between generations: the population is the next one to play
+        checkpoint.save_checkpoint(
+            self.checkpoint_dir,
+            self.generation,
+            self.population,
+            self.best_chromosome,
+            self.best_score,
+            self.best_fitness,
+            np.array(self.history, dtype=np.float64).reshape(-1, 4),
+            self.rng,
+            improved_generation=self.improved_generation,
+            keep=self.checkpoint_keep
+        )
+
+    def resume(self, path:Path) -> None:
+        state = checkpoint.load_checkpoint(path, self.rng)
+        if state['population'].shape != self.population.shape:
+            raise ValueError(f'{path} holds a {state["population"].shape} population, expected {self.population.shape} (population_size or network changed)')
+        self.population[:] = state['population']
+        self.best_chromosome = state['best_chromosome']
+        self.best_score = state['best_score']
+        self.best_fitness = state['best_fitness']
+        self.history = [tuple(row) for row in state['history']]
+        self.generation = state['generation']
+        self.improved_generation = state['improved_generation']
+        print(f'Resuming training from {path} (generation {self.generation})')
+
+    def mutate(self, population:np.ndarray) -> None:
+        genetic.mutate(population, self.ga_configs.get('mutation_probability', 0.05), self.ga_configs.get('mutation_standard_deviation', 0.3))
+
+    def track_best(self, fitness:np.ndarray, scores:np.ndarray) -> None:
+        # The best individual is the fittest one, the best score is only reported (and used by the stop conditions)
+        best = int(np.argmax(fitness))
+        if fitness[best] > self.best_fitness:
+            self.best_fitness = float(fitness[best])
+            self.best_chromosome = self.population[best].copy()
+            self.improved_generation = self.generation
+        self.best_score = max(self.best_score, int(scores.max()))
 
     def check_quit_event(self, event):
         if event.type == QUIT or (
@@ -140,86 +213,84 @@ class TrainGA:
     def quit(self) -> None:
         try:
             if self.ga_configs.get('save_best', True):
-                self.best_individual.save() # Save the best individual state dict in a file
+                # Save the best individual state dict in a file
+                FFPlayer(self.config, self.best_chromosome, **self.network).save()
         except AttributeError:
             pass
-        del self.nn_plotter
+        if self.nn_plotter is not None:
+            del self.nn_plotter
+        if self.evaluator is not None:
+            self.evaluator.close()
+        if self.profiler.enabled:
+            print(f'>>> Profile of the whole training\n{self.profiler.close()}')
         pygame.quit()
         sys.exit()
 
-    async def play(self):
-        for individual in self.population:
-            individual.flappy.set_mode(FlappyMode.NORMAL)
+    def check_stop_conditions(self) -> None:
+        generation_condition = self.generation >= self.ga_configs.get('stop_condition', {}).get('generations', float('inf'))
+        score_condition = self.best_score >= self.ga_configs.get('stop_condition', {}).get('score', float('inf'))
+        time_condition = time.time() - self.training_start > self.ga_configs.get('stop_condition', {}).get('time', float('inf'))
+        if generation_condition or score_condition or time_condition:
+            self.quit()
+
+    def evaluate_parallel(self) -> tuple[np.ndarray, np.ndarray]:
+        for event in pygame.event.get():
+            self.check_quit_event(event)
+        # Workers are not profiled, their whole generation is a single phase
+        with self.profiler.phase('evaluation'):
+            fitness, scores = self.evaluator.evaluate(self.population, self.seed)
+        # === Track best individual
+        self.track_best(fitness, scores)
+        self.check_stop_conditions()
+        return fitness, scores
 
+    async def play(self) -> np.ndarray:
+        flock = self.episode.flock
+        profiler = self.profiler
+        # Individual shown by the visualizer, kept while it is alive
+        watched = None
         while True:
-            current_events = []
-            scored = False
-            death_count = 0
-
-            for event in pygame.event.get():
-                self.check_quit_event(event)
-                current_events.append(event)
-
-            for individual in self.population:
-                if individual.state is PlayerState.DEAD:
-                    death_count += 1
-                    continue
-                if individual.check_colision(self.pipes, self.floor):
-                    individual.crash()
-                for _, pipe in enumerate(self.pipes.upper):
-                    if individual.check_crossed_pipe(pipe):
-                        individual.scored() # just set scored to True, its not cummulative
-                        scored=True
-
-                for event in current_events:
-                    individual.process_event(event)
-
-                # Allow individual to execute a single action (jump or not)
-                individual.make_a_play(self.pipes)
-                
-            if scored:
-                self.score.add()
-                scored = False
-            
-            if death_count == self.population_size:
-                return
-            else:
-                death_count = 0
-    
-            self.background.tick()
-            self.floor.tick()
-            self.pipes.tick()
-            self.score.tick()
-            for individual in self.population:
-                if individual.state == PlayerState.ALIVE:
-                    individual.tick()
-                    # === Track best individual
-                    if individual.score > self.best_individual.score:
-                        self.best_individual = individual
-            
-            for individual in self.population:
-                if individual.state is PlayerState.ALIVE:
-                    self.nn_plotter.update(individual.get_last_state())
-                    break
+            with profiler.phase('events'):
+                for event in pygame.event.get():
+                    # AI won't use any keyboard events to play, only quitting is handled
+                    self.check_quit_event(event)
+
+            if self.episode.done:
+                fitness = self.episode.finish()
+                # === Track best individual
+                self.track_best(fitness, flock.score)
+                return fitness
+
+            # All birds are advanced together (collision, inference, physics and rendering phases)
+            if self.episode.step():
+                # === Track best individual (fitness so far, so a score stop condition saves the current best)
+                self.track_best(self.episode.fitness, flock.score)
+
+            if self.nn_plotter is not None and flock.alive.any() and self.nn_plotter.due():
+                with profiler.phase('plotter'):
+                    if watched is None or not flock.alive[watched]:
+                        watched = int(np.argmax(flock.alive)) # first individual alive
+                    self.nn_plotter.update(*self.brains.last_state_arrays(watched))
 
-            generation_condition = self.generation >= self.ga_configs.get('stop_condition', {}).get('generations', float('inf'))
-            score_condition = self.best_individual.score >= self.ga_configs.get('stop_condition', {}).get('score', float('inf'))
-            time_condition = time.time() - self.training_start > self.ga_configs.get('stop_condition', {}).get('time', float('inf'))
-            if generation_condition or score_condition or time_condition:
-                self.quit()
+            self.check_stop_conditions()
 
-            pygame.display.update()
-            await asyncio.sleep(0)
-            self.config.tick()
+            if not self.headless:
+                with profiler.phase('display'):
+                    self.config.renderer.present()
+            # Waiting for the fps cap (0 when headless)
+            with profiler.phase('frame_wait'):
+                await asyncio.sleep(0)
+                self.config.tick()
 
     async def reset(self):
-        self.pipes.stop()
-        self.floor.stop()
-        self.background.tick()
-        self.floor.tick()
-        self.pipes.tick()
-        self.score.tick()
-        for individual in self.population:
-            individual.tick()
+        episode = self.episode
+        episode.pipes.stop()
+        episode.floor.stop()
+        episode.background.tick()
+        episode.floor.tick()
+        episode.pipes.tick()
+        episode.score.tick()
+        episode.flock.tick()
         self.config.tick()
-        pygame.display.update()
\ No newline at end of file
+        if not self.headless:
+            self.config.renderer.present()
@@ -1,5 +1,7 @@
 from .game_config import GameConfig
 from .images import Images
+from .profiler import NullProfiler, Profiler
+from .renderer import Renderer
 from .sounds import Sounds
 from .utils import clamp, get_hit_mask, pixel_collision
 from .window import Window
@@ -1,8 +1,11 @@
 import os
+import random
+from typing import Optional
 
 import pygame
 
 from .images import Images
+from .renderer import Renderer
 from .sounds import Sounds
 from .window import Window
 
@@ -16,6 +19,7 @@ class GameConfig:
         window: Window,
         images: Images,
         sounds: Sounds,
+        headless: bool = False,
     ) -> None:
         self.screen = screen
         self.clock = clock
@@ -23,7 +27,34 @@ class GameConfig:
         self.window = window
         self.images = images
         self.sounds = sounds
+        self.headless = headless
         self.debug = os.environ.get("DEBUG", False)
+        # the debug overlay is drawn outside of the renderer, so redraw everything then
+        self.renderer = Renderer(screen, full=bool(self.debug))
+
+    @classmethod
+    def create_headless(
+        cls, fps: int = 30, seed: Optional[int] = None
+    ) -> "GameConfig":
+        """builds a config without window, audio mixer or frame cap"""
+        # surfaces are still needed for the hit masks, so use SDL's dummy drivers
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        pygame.display.init()
+        window = Window(288, 512)
+        screen = pygame.display.set_mode((window.width, window.height))
+        return cls(
+            screen=screen,
+            clock=pygame.time.Clock(),
+            fps=fps,
+            window=window,
+            images=Images(random.Random(seed)),
+            sounds=Sounds(enabled=False),
+            headless=True,
+        )
 
     def tick(self) -> None:
+        # headless runs are not bound to wall-clock time, so never cap them
+        if self.headless:
+            return
         self.clock.tick(self.fps)
@@ -1,9 +1,40 @@
 import random
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import pygame
 
 from .constants import BACKGROUNDS, PIPES, PLAYERS
+from .utils import get_hit_mask, memoize
+
+# Sprites are loaded (and converted) once per process, every Images instance
+# and randomize() reuses the same surfaces, so their memoized hit masks too
+
+
+@memoize
+def load_image(path: str, alpha: bool = True) -> pygame.Surface:
+    """loads and converts a sprite, only the first time it is asked for"""
+    image = pygame.image.load(path)
+    return image.convert_alpha() if alpha else image.convert()
+
+
+@memoize
+def load_pipes(path: str) -> Tuple[pygame.Surface, pygame.Surface]:
+    """upper (flipped) and lower pipe sprites"""
+    pipe = load_image(path)
+    return pygame.transform.flip(pipe, False, True), pipe
+
+
+def preload() -> None:
+    """loads every sprite variant and computes the hit masks of the ones that collide"""
+    for path in BACKGROUNDS:
+        load_image(path, alpha=False)
+    for paths in PLAYERS:
+        for path in paths:
+            get_hit_mask(load_image(path))
+    for path in PIPES:
+        for pipe in load_pipes(path):
+            get_hit_mask(pipe)
+    get_hit_mask(load_image("assets/sprites/base.png"))
 
 
 class Images:
@@ -15,45 +46,45 @@ class Images:
     player: Tuple[pygame.Surface]
     pipe: Tuple[pygame.Surface]
 
-    def __init__(self) -> None:
-        self.numbers = list(
-            (
-                pygame.image.load(f"assets/sprites/{num}.png").convert_alpha()
-                for num in range(10)
-            )
-        )
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
+        preload()
+        self.numbers = [
+            load_image(f"assets/sprites/{num}.png") for num in range(10)
+        ]
 
         # game over sprite
-        self.game_over = pygame.image.load(
-            "assets/sprites/gameover.png"
-        ).convert_alpha()
+        self.game_over = load_image("assets/sprites/gameover.png")
         # welcome_message sprite for welcome screen
-        self.welcome_message = pygame.image.load(
-            "assets/sprites/message.png"
-        ).convert_alpha()
+        self.welcome_message = load_image("assets/sprites/message.png")
         # base (ground) sprite
-        self.base = pygame.image.load("assets/sprites/base.png").convert_alpha()
-        self.randomize()
+        self.base = load_image("assets/sprites/base.png")
+        self.randomize(rng)
 
-    def randomize(self):
+    def randomize(self, rng: Optional[random.Random] = None):
+        # sprites are only cosmetic, an explicit rng keeps them from consuming the global random state
+        rng = rng or random
         # select random background sprites
-        rand_bg = random.randint(0, len(BACKGROUNDS) - 1)
+        rand_bg = rng.randint(0, len(BACKGROUNDS) - 1)
         # select random player sprites
-        rand_player = random.randint(0, len(PLAYERS) - 1)
+        rand_player = rng.randint(0, len(PLAYERS) - 1)
         # select random pipe sprites
-        rand_pipe = random.randint(0, len(PIPES) - 1)
-
-        self.background = pygame.image.load(BACKGROUNDS[rand_bg]).convert()
-        self.player = (
-            pygame.image.load(PLAYERS[rand_player][0]).convert_alpha(),
-            pygame.image.load(PLAYERS[rand_player][1]).convert_alpha(),
-            pygame.image.load(PLAYERS[rand_player][2]).convert_alpha(),
-        )
-        self.pipe = (
-            pygame.transform.flip(
-                pygame.image.load(PIPES[rand_pipe]).convert_alpha(),
-                False,
-                True,
-            ),
-            pygame.image.load(PIPES[rand_pipe]).convert_alpha(),
-        )
+        rand_pipe = rng.randint(0, len(PIPES) - 1)
+
+        self.background = load_image(BACKGROUNDS[rand_bg], alpha=False)
+        self.player = tuple(load_image(path) for path in PLAYERS[rand_player])
+        self.pipe = load_pipes(PIPES[rand_pipe])
+        # rotations of the player sprites, keyed by (sprite index, angle)
+        self._rotated_player: Dict[Tuple[int, int], pygame.Surface] = {}
+
+    def rotated_player(self, index: int, angle: float) -> pygame.Surface:
+        """player sprite rotated by angle, rounded to a whole degree.
+
+        Rotation angles are bounded, so every (sprite, angle) pair is rotated
+        only once and the same surface (with its memoized hit mask) is reused.
+        """
+        key = (index, round(angle))
+        surface = self._rotated_player.get(key)
+        if surface is None:
+            surface = pygame.transform.rotate(self.player[index], key[1])
+            self._rotated_player[key] = surface
+        return surface
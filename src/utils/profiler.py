@@ -0,0 +1,156 @@
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional
+
+
+class Profiler:
+    """Accumulates the wall-clock time spent in named phases of a game loop.
+
+    Usage: `with profiler.phase("collision"): ...`. Phases can repeat, their
+    time and number of calls are summed. `end_frame()` and `end_generation()`
+    mark the loop boundaries, so the cost of each phase can be reported per
+    frame and per generation. With a trace_file, every phase call is also kept
+    as an event and written by `close()` in the Chrome trace format (open it
+    in chrome://tracing or https://ui.perfetto.dev).
+    """
+
+    enabled = True
+
+    def __init__(self, trace_file: Optional[str] = None) -> None:
+        self.trace_file = trace_file
+        self.trace = trace_file is not None
+        self.reset()
+
+    def reset(self) -> None:
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.frames = 0
+        self.generations: List[Dict[str, Any]] = []
+        self.events: List[tuple] = []
+        self.origin = time.perf_counter()
+        self._generation_start = self.origin
+        self._generation_frames = 0
+        self._generation_totals: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.totals[name] = self.totals.get(name, 0.0) + elapsed
+            self.counts[name] = self.counts.get(name, 0) + 1
+            if self.trace:
+                self.events.append((name, start, elapsed))
+
+    def end_frame(self) -> None:
+        self.frames += 1
+
+    def end_generation(self) -> Dict[str, Any]:
+        """closes the current generation, returns its frames, seconds and time per phase"""
+        now = time.perf_counter()
+        frames = self.frames - self._generation_frames
+        phases = {
+            name: total - self._generation_totals.get(name, 0.0)
+            for name, total in self.totals.items()
+        }
+        generation = {
+            "generation": len(self.generations) + 1,
+            "frames": frames,
+            "seconds": now - self._generation_start,
+            "phases": {
+                name: {
+                    "seconds": seconds,
+                    "ms_per_frame": 1000 * seconds / max(frames, 1),
+                }
+                for name, seconds in phases.items()
+                if seconds > 0
+            },
+        }
+        self.generations.append(generation)
+        if self.trace:
+            name = f"generation {generation['generation']}"
+            self.events.append(
+                (name, self._generation_start, generation["seconds"])
+            )
+        self._generation_start = now
+        self._generation_frames = self.frames
+        self._generation_totals = dict(self.totals)
+        return generation
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """seconds, calls and milliseconds per call and per frame of every phase"""
+        return {
+            name: {
+                "seconds": total,
+                "calls": self.counts[name],
+                "mean_ms": 1000 * total / self.counts[name],
+                "ms_per_frame": 1000 * total / max(self.frames, 1),
+            }
+            for name, total in self.totals.items()
+        }
+
+    def format_summary(
+        self, generation: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """one line per phase, slowest first, for the whole run or a single generation"""
+        if generation is None:
+            frames = self.frames
+            phases = {
+                name: phase["seconds"] for name, phase in self.summary().items()
+            }
+        else:
+            frames = generation["frames"]
+            phases = {
+                name: phase["seconds"]
+                for name, phase in generation["phases"].items()
+            }
+        total = sum(phases.values()) or 1
+        # Without frames (e.g. generations played by worker processes) the totals are shown
+        unit = "ms/frame" if frames else "ms"
+        lines = [f"{frames} frames"]
+        for name, seconds in sorted(phases.items(), key=lambda item: -item[1]):
+            lines.append(
+                f"  {name:<12} {1000 * seconds / max(frames, 1):8.3f} {unit}"
+                f" {100 * seconds / total:5.1f} %"
+            )
+        return "\n".join(lines)
+
+    def close(self) -> str:
+        """writes the trace file (if any), returns the summary of the whole run"""
+        if self.trace_file is not None:
+            self.dump_trace(self.trace_file)
+        return self.format_summary()
+
+    def dump_trace(self, path: str) -> None:
+        """writes the recorded events as a Chrome trace JSON file"""
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": 1e6 * (start - self.origin),
+                "dur": 1e6 * duration,
+                "pid": pid,
+                "tid": 0,
+            }
+            for name, start, duration in self.events
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+class NullProfiler(Profiler):
+    """Profiler that records nothing, the default when profiling is off"""
+
+    enabled = False
+    _context = nullcontext()
+
+    def phase(self, name: str):
+        return self._context
+
+    def end_frame(self) -> None:
+        pass
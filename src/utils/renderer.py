@@ -0,0 +1,62 @@
+from typing import List, Optional
+
+import pygame
+
+
+class Renderer:
+    """Dirty rectangle rendering of the game screen.
+
+    Entities blit through the renderer, which keeps the rects drawn on each
+    frame. The background is cached and, instead of redrawing it whole, only
+    the rects drawn on the previous frame are restored from it, then only the
+    previous and current rects are sent to the display. With full=True (or in
+    debug mode, whose overlay is drawn directly on the screen) every frame is
+    redrawn and updated whole, as before.
+    """
+
+    # above this many rects a single rect covering them all is updated instead
+    max_rects = 32
+
+    def __init__(self, screen: pygame.Surface, full: bool = False) -> None:
+        self.screen = screen
+        self.full = full
+        self.background: Optional[pygame.Surface] = None
+        self._source: Optional[pygame.Surface] = None
+        self.previous: List[pygame.Rect] = []
+        self.current: List[pygame.Rect] = []
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """the next frame redraws and updates the whole screen"""
+        self.valid = False
+
+    def draw_background(self, image: pygame.Surface) -> None:
+        """first draw of a frame: clears what was drawn on the previous frame"""
+        if image is not self._source:
+            # converted once, without alpha channel, so restoring rects is a plain copy
+            self._source = image
+            self.background = image.convert()
+            self.invalidate()
+        if self.full or not self.valid:
+            self.screen.blit(self.background, (0, 0))
+            return
+        for rect in self.previous:
+            self.screen.blit(self.background, rect, rect)
+
+    def blit(self, image: pygame.Surface, dest) -> pygame.Rect:
+        rect = self.screen.blit(image, dest)
+        self.current.append(rect)
+        return rect
+
+    def present(self) -> None:
+        """sends the frame to the display, only the changed rects when possible"""
+        if self.full or not self.valid:
+            pygame.display.update()
+            self.valid = True
+        else:
+            rects = self.previous + self.current
+            if len(rects) > self.max_rects:
+                rects = [rects[0].unionall(rects[1:])]
+            pygame.display.update(rects)
+        self.previous, self.current = self.current, self.previous
+        self.current.clear()
@@ -2,6 +2,26 @@ import sys
 
 import pygame
 
+from .utils import memoize
+
+
+class SilentSound:
+    """Stand-in for pygame.mixer.Sound when the mixer is not initialized"""
+
+    def play(self, *args, **kwargs) -> None:
+        pass
+
+    def set_volume(self, value: float) -> None:
+        pass
+
+
+@memoize
+def load_sound(path: str) -> pygame.mixer.Sound:
+    """sounds are only read from disk once per process"""
+    sound = pygame.mixer.Sound(path)
+    sound.set_volume(0)
+    return sound
+
 
 class Sounds:
     die: pygame.mixer.Sound
@@ -10,20 +30,22 @@ class Sounds:
     swoosh: pygame.mixer.Sound
     wing: pygame.mixer.Sound
 
-    def __init__(self) -> None:
+    def __init__(self, enabled: bool = True) -> None:
+        if not enabled:
+            self.die = SilentSound()
+            self.hit = SilentSound()
+            self.point = SilentSound()
+            self.swoosh = SilentSound()
+            self.wing = SilentSound()
+            return
+
         if "win" in sys.platform:
             ext = "wav"
         else:
             ext = "ogg"
 
-        self.die = pygame.mixer.Sound(f"assets/audio/die.{ext}")
-        self.hit = pygame.mixer.Sound(f"assets/audio/hit.{ext}")
-        self.point = pygame.mixer.Sound(f"assets/audio/point.{ext}")
-        self.swoosh = pygame.mixer.Sound(f"assets/audio/swoosh.{ext}")
-        self.wing = pygame.mixer.Sound(f"assets/audio/wing.{ext}")
-
-        self.die.set_volume(0)
-        self.hit.set_volume(0)
-        self.point.set_volume(0)
-        self.swoosh.set_volume(0)
-        self.wing.set_volume(0)
\ No newline at end of file
+        self.die = load_sound(f"assets/audio/die.{ext}")
+        self.hit = load_sound(f"assets/audio/hit.{ext}")
+        self.point = load_sound(f"assets/audio/point.{ext}")
+        self.swoosh = load_sound(f"assets/audio/swoosh.{ext}")
+        self.wing = load_sound(f"assets/audio/wing.{ext}")
@@ -1,9 +1,8 @@
 from functools import wraps
-from typing import List
 
 import pygame
 
-HitMaskType = List[List[bool]]
+HitMaskType = pygame.mask.Mask
 
 
 def clamp(n: float, minn: float, maxn: float) -> float:
@@ -27,17 +26,8 @@ def memoize(func):
 @memoize
 def get_hit_mask(image: pygame.Surface) -> HitMaskType:
     """returns a hit mask using an image's alpha."""
-    return list(
-        (
-            list(
-                (
-                    bool(image.get_at((x, y))[3])
-                    for y in range(image.get_height())
-                )
-            )
-            for x in range(image.get_width())
-        )
-    )
+    # threshold 0: every pixel that is not fully transparent is solid
+    return pygame.mask.from_surface(image, 0)
 
 
 def pixel_collision(
@@ -47,16 +37,8 @@ def pixel_collision(
     hitmask2: HitMaskType,
 ):
     """Checks if two objects collide and not just their rects"""
-    rect = rect1.clip(rect2)
-
-    if rect.width == 0 or rect.height == 0:
+    if not rect1.colliderect(rect2):
         return False
 
-    x1, y1 = rect.x - rect1.x, rect.y - rect1.y
-    x2, y2 = rect.x - rect2.x, rect.y - rect2.y
-
-    for x in range(rect.width):
-        for y in range(rect.height):
-            if hitmask1[x1 + x][y1 + y] and hitmask2[x2 + x][y2 + y]:
-                return True
-    return False
+    offset = (rect2.x - rect1.x, rect2.y - rect1.y)
+    return hitmask1.overlap(hitmask2, offset) is not None